@@ -0,0 +1,11 @@
+#!/bin/bash
+
+script_dir=$(cd $(dirname $0);pwd)
+echo $script_dir
+pushd $script_dir
+
+python3 -m build_tools.build_index --profile default profile/linux-armv8 profile/linux-armv7hf profile/android-armbeabi-v7a "$@"
+status=$?
+
+popd
+exit $status
@@ -0,0 +1,202 @@
+"""
+
+Binary store shared by the build hosts: a conan remote to which the build driver
+uploads every package it creates, and from which later runs download the
+packages whose package ID already exists instead of building them.
+
+The store is a folder, e.g. on a shared filesystem, served as a conan remote by
+`conan_server` (shipped with conan) running on the local host:
+
+    # Serve the store, then `conan remote add cci_binary_store http://localhost:9300 False`
+    python3 -m build_tools.binary_remote serve /mnt/shared/conan-binaries --port 9300
+
+    # Copy the packages of the manifest from the conan cache to the store, or back
+    python3 -m build_tools.binary_remote push /mnt/shared/conan-binaries
+    python3 -m build_tools.binary_remote pull /mnt/shared/conan-binaries
+
+"""
+
+import argparse
+import os
+import secrets
+import socket
+import subprocess
+import sys
+import textwrap
+import time
+
+from build_tools.conan_cache import in_local_cache
+from build_tools.recipe_graph import PACKAGES_FILE, load_packages
+
+
+STORE_REMOTE = "cci_binary_store"
+# Account of the uploads, its password is generated for each server unless one is given
+STORE_USER = "cci"
+START_TIMEOUT = 30
+
+
+def _server_conf(store, port, bind, password):
+    return textwrap.dedent(f"""\
+        [server]
+        jwt_secret: {secrets.token_hex(16)}
+        jwt_expire_minutes: 120
+        ssl_enabled: False
+        port: {port}
+        public_port:
+        host_name: {bind}
+        authorize_timeout: 1800
+        disk_storage_path: {os.path.join(store, "data")}
+        disk_authorize_timeout: 1800
+        updown_secret: {secrets.token_hex(16)}
+
+        [write_permissions]
+        */*@*/*: {STORE_USER}
+
+        [read_permissions]
+        */*@*/*: *
+
+        [users]
+        {STORE_USER}: {password}
+        """)
+
+
+def free_port(bind="127.0.0.1"):
+    with socket.socket() as s:
+        s.bind((bind, 0))
+        return s.getsockname()[1]
+
+
+class StoreServer(object):
+    """ `conan_server` serving a store folder, its configuration lives in the server home of the local host """
+
+    def __init__(self, store, port=0, bind="127.0.0.1", home=None, password=None):
+        self.store = os.path.abspath(store)
+        self.port = port or free_port(bind)
+        self.bind = bind
+        # A fixed password would let anyone reaching the port upload binaries
+        self.password = password or secrets.token_urlsafe(16)
+        # Each host runs its own server over the shared folder, their configurations must not collide
+        self.home = home or os.path.join(self.store, ".server", socket.gethostname())
+        self.process = None
+
+    @property
+    def url(self):
+        return f"http://{self.bind}:{self.port}"
+
+    def start(self):
+        folder = os.path.join(self.home, ".conan_server")
+        os.makedirs(folder, exist_ok=True)
+        with open(os.path.join(folder, "server.conf"), "w") as f:
+            f.write(_server_conf(self.store, self.port, self.bind, self.password))
+        env = dict(os.environ, CONAN_SERVER_HOME=folder)
+        log = open(os.path.join(folder, "server.log"), "a")
+        self.process = subprocess.Popen(["conan_server"], env=env, stdout=log, stderr=subprocess.STDOUT)
+        deadline = time.monotonic() + START_TIMEOUT
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"conan_server exited with {self.process.returncode}, see {log.name}")
+            try:
+                socket.create_connection((self.bind, self.port), timeout=1).close()
+                return self
+            except OSError:
+                time.sleep(0.2)
+        self.stop()
+        raise RuntimeError(f"conan_server did not listen on {self.url} after {START_TIMEOUT} s")
+
+    def stop(self):
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            self.process.wait()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def _conan(args, cwd=None, stdout=None):
+    return subprocess.run(["conan"] + args, cwd=cwd, stdout=stdout, stderr=subprocess.STDOUT).returncode
+
+
+def add_remote(name, url, password):
+    """ Registers the remote in the conan home and logs in to it, returns False on failure """
+    return _conan(["remote", "add", name, url, "False", "--force"]) == 0 \
+        and _conan(["user", STORE_USER, "-p", password, "-r", name]) == 0
+
+
+def remove_remote(name):
+    _conan(["remote", "remove", name])
+
+
+class BinaryRemote(object):
+    """ Downloads and uploads the packages of the build driver from and to a conan remote """
+
+    def __init__(self, name):
+        self.name = name
+
+    def download(self, command, cwd, log_path):
+        """ Runs a `conan install --build=never` from the remote, True if the package was found """
+        with open(log_path, "w") as log:
+            return subprocess.run(command + ["-r", self.name, "--build=never"], cwd=cwd,
+                                  stdout=log, stderr=subprocess.STDOUT).returncode == 0
+
+    def upload(self, package, package_id, log_path):
+        """ Uploads the recipe and the binary `package_id` of a package of the conan cache """
+        with open(log_path, "w") as log:
+            return _conan(["upload", f"{package.ref}@:{package_id}", "-r", self.name, "-c"],
+                          stdout=log) == 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Share the binary packages of the index between build hosts.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    server = subparsers.add_parser("serve", help="serve a store folder as a conan remote.")
+    server.add_argument("store")
+    server.add_argument("--port", type=int, default=9300)
+    server.add_argument("--bind", default="127.0.0.1")
+    server.add_argument("--password", default=os.environ.get("CCI_BINARY_STORE_PASSWORD"),
+                        help=f"password of the {STORE_USER} account which uploads "
+                             "(default: $CCI_BINARY_STORE_PASSWORD, or generated for this run).")
+    for command, description in (("push", "upload the binaries of the conan cache to a store folder."),
+                                 ("pull", "download all the binaries of a store folder to the conan cache.")):
+        sync = subparsers.add_parser(command, help=description)
+        sync.add_argument("store")
+        sync.add_argument("--packages", default=PACKAGES_FILE, help="manifest of the packages to synchronize.")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        with StoreServer(args.store, args.port, args.bind, password=args.password) as store_server:
+            print(f"Serving {store_server.store} on {store_server.url}, "
+                  f"user {STORE_USER}, password {store_server.password}")
+            try:
+                store_server.process.wait()
+            except KeyboardInterrupt:
+                pass
+        return 0
+
+    packages = load_packages(args.packages)
+    failed = []
+    with StoreServer(args.store) as store_server:
+        if not add_remote(STORE_REMOTE, store_server.url, store_server.password):
+            return 1
+        try:
+            for package in packages.values():
+                if args.command == "push":
+                    if not in_local_cache(package):
+                        continue
+                    returncode = _conan(["upload", f"{package.ref}@", "-r", STORE_REMOTE, "--all", "-c"])
+                else:
+                    returncode = _conan(["download", f"{package.ref}@", "-r", STORE_REMOTE])
+                if returncode != 0:
+                    failed.append(package.ref)
+        finally:
+            remove_remote(STORE_REMOTE)
+    if failed:
+        print(f"Not synchronized: {', '.join(failed)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
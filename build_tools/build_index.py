@@ -0,0 +1,382 @@
+"""
+
+Build the packages of build_tools/packages.yml with `conan create`, running
+independent recipes concurrently in dependency order, for one or several
+host profiles.
+
+"""
+
+import argparse
+import concurrent.futures
+import json
+import os
+import re
+import subprocess
+import tempfile
+import threading
+
+from build_tools.binary_remote import STORE_REMOTE, BinaryRemote, StoreServer, add_remote, remove_remote
+from build_tools.build_plan import plan, report_plan
+from build_tools.checkpoint import CheckpointJournal
+from build_tools.conan_cache import source_ready
+from build_tools.fingerprint import FingerprintStore, fingerprints
+from build_tools.layout import REPO_ROOT
+from build_tools.recipe_graph import PACKAGES_FILE, load_packages, critical_path, topological_order
+from build_tools.scheduler import Job, Scheduler, SUCCESS
+from build_tools.source_cache import SourceCache, serve, version_sources
+from build_tools.telemetry import TelemetryHistory, created_package_id, package_size, physical_memory, report, run_measured
+
+
+# Expected peak RSS per build job of the packages without telemetry yet
+DEFAULT_MEMORY_PER_JOB = 1 << 30
+# Environment variables naming the compiler launcher: CMake 3.17 or later reads the first two as the default
+# of the cache variables of the same names, the recipe of qt the last one
+LAUNCHER_VARIABLES = ("CMAKE_C_COMPILER_LAUNCHER", "CMAKE_CXX_COMPILER_LAUNCHER", "CCI_COMPILER_LAUNCHER")
+
+
+def profile_argument(profile):
+    """ Profiles existing as files (e.g. profile/linux-armv8) are passed as absolute paths,
+        anything else is a profile name of the conan home (e.g. default) """
+    for candidate in (profile, os.path.join(REPO_ROOT, profile)):
+        if os.path.isfile(candidate):
+            return os.path.abspath(candidate)
+    return profile
+
+
+def profile_label(profile):
+    return os.path.basename(profile)
+
+
+class Build(object):
+    """ The `conan create` of a package for a host profile """
+
+    def __init__(self, package, host_profile, build_profile):
+        self.package = package
+        self.host_profile = host_profile
+        self.build_profile = build_profile
+        self.options = dict(package.options)
+        if profile_argument(host_profile) != profile_argument(build_profile):
+            self.options.update(package.cross_options)
+
+    @property
+    def key(self):
+        return f"{self.package.name}@{profile_label(self.host_profile)}"
+
+    def _arguments(self):
+        arguments = [f"-pr:b={profile_argument(self.build_profile)}",
+                     f"-pr:h={profile_argument(self.host_profile)}"]
+        for option, value in self.options.items():
+            arguments.extend(["-o", f"{self.package.name}:{option}={value}"])
+        return arguments
+
+    def command(self):
+        package = self.package
+        return ["conan", "create", os.path.relpath(package.conanfile, package.recipe_dir), f"{package.ref}@",
+                # The recipe was exported before the builds fanned out: never
+                # remove the sources which the other profiles are building from
+                "--keep-source"] + self._arguments()
+
+    def info_command(self, json_path):
+        """ `conan info` of the package, written as JSON to `json_path` """
+        return ["conan", "info", f"{self.package.ref}@", f"--json={json_path}"] + self._arguments()
+
+    def install_command(self, install_folder, json_path):
+        """ `conan install` of the package itself, with the same settings and options as command(),
+            its result is written as JSON to `json_path` """
+        return ["conan", "install", f"{self.package.ref}@", f"--install-folder={install_folder}",
+                f"--json={json_path}"] + self._arguments()
+
+    def log_file(self, log_dir):
+        name = re.sub(r"[^\w.+-]", "_", f"{self.package.name}-{self.package.version}-{profile_label(self.host_profile)}")
+        return os.path.join(log_dir, f"{name}.log")
+
+
+def run_logged(key, command, cwd, log_path, env=None, poll=None):
+    """ Runs a command with its output redirected to `log_path`, calling `poll()`
+        every second while it is running, and returns its telemetry.Usage """
+    with open(log_path, "w") as log:
+        usage = run_measured(command, cwd=cwd, env=env, stdout=log, poll=poll)
+    if usage.returncode != 0:
+        print(f"[{key}] {' '.join(command[:2])} returned {usage.returncode}, see {log_path}")
+    return usage
+
+
+def conan_export(package, log_dir):
+    command = ["conan", "export", os.path.relpath(package.conanfile, package.recipe_dir), f"{package.ref}@"]
+    log_path = os.path.join(log_dir, f"{package.name}-{package.version}-export.log")
+    return run_logged(f"export:{package.name}", command, package.recipe_dir, log_path).returncode == 0
+
+
+def conan_create(job, log_dir, history, poll=None):
+    """ Runs `conan create` for the build of the job, the output goes to its log file
+        and its resource usage to the telemetry history, returns (success, package ID) """
+    build = job.payload
+    env = dict(os.environ)
+    # Build jobs of CMake, Make, ninja... used by the recipe
+    env["CONAN_CPU_COUNT"] = str(job.slots)
+    log_path = build.log_file(log_dir)
+    usage = run_logged(job.key, build.command(), build.package.recipe_dir, log_path, env=env, poll=poll)
+    package_id = created_package_id(log_path) if usage.returncode == 0 else None
+    history.record(build.package, profile_label(build.host_profile), usage, package_id=package_id,
+                   size=package_size(build.package, package_id), jobs=job.slots)
+    return usage.returncode == 0, package_id
+
+
+def download_package(remote, build, log_dir):
+    """ Installs the package of the build from the binary remote, returns its package ID,
+        None if the remote has no binary for this package ID """
+    log_path = os.path.splitext(build.log_file(log_dir))[0] + "-download.log"
+    with tempfile.TemporaryDirectory() as install_folder:
+        json_path = os.path.join(install_folder, "install.json")
+        if not remote.download(build.install_command(install_folder, json_path), install_folder, log_path) \
+                or not os.path.isfile(json_path):
+            return None
+        with open(json_path) as f:
+            installed = json.load(f).get("installed", [])
+    for node in installed:
+        if node["recipe"]["id"].split("#")[0].split("@")[0] == build.package.ref and node.get("packages"):
+            return node["packages"][0]["id"]
+    return None
+
+
+def upload_package(remote, build, package_id, log_dir):
+    log_path = os.path.splitext(build.log_file(log_dir))[0] + "-upload.log"
+    if not package_id or not remote.upload(build.package, package_id, log_path):
+        print(f"[{build.key}] could not be uploaded to {remote.name}, see {log_path}")
+
+
+class SourceGate(object):
+    """ Holds back the builds of a package for the other profiles until the first
+        one has unpacked the sources in the conan cache, where they are shared """
+
+    def __init__(self, package, leader_key):
+        self.package = package
+        self.leader_key = leader_key
+        self.ready = threading.Event()
+
+    def poll(self):
+        if not self.ready.is_set() and source_ready(self.package):
+            self.ready.set()
+
+    def __call__(self, status):
+        return self.ready.is_set() or self.leader_key in status
+
+
+def build_jobs(packages, profiles, build_profile, slots, history=None):
+    """ One export job per package, then one build job per package and profile, the memory
+        of the build jobs is predicted from the peak RSS per job of their previous builds """
+    priority = critical_path(packages)
+    jobs = []
+    gates = {}
+    for name, package in packages.items():
+        export_key = f"export:{name}"
+        jobs.append(Job(export_key, priority=priority[name] + 1, payload=package))
+        leader = Build(package, profiles[0], build_profile)
+        gates[name] = SourceGate(package, leader.key)
+        for index, profile in enumerate(profiles):
+            build = Build(package, profile, build_profile)
+            deps = {export_key} | {Build(packages[dep], profile, build_profile).key for dep in package.requires}
+            memory = history.memory_per_job(package.ref, profile_label(profile)) if history else None
+            jobs.append(Job(build.key, deps=deps, slots=slots, priority=priority[name], payload=build,
+                            gate=gates[name] if index else None, memory=memory or DEFAULT_MEMORY_PER_JOB))
+    return jobs, gates
+
+
+def build_plan(args, packages, fingerprint, stores, history, log_dir):
+    """ --plan: the recipes are exported to compute the package IDs, nothing is built """
+    journal = CheckpointJournal(os.path.join(args.state_dir, "checkpoint.jsonl"), resume=True) if args.resume else None
+
+    def skip_reason(build):
+        current = fingerprint[build.host_profile][build.package.name]
+        if journal and journal.completed(build.key, build.package, current):
+            return "completed by the previous run"
+        if args.incremental and stores[build.host_profile].is_current(build.package, current):
+            return "up to date"
+        return None
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+        exported = dict(zip(packages, executor.map(lambda package: conan_export(package, log_dir), packages.values())))
+    if not all(exported.values()):
+        print(f"Cannot export: {', '.join(name for name, ok in exported.items() if not ok)}")
+        return 1
+    builds = [Build(packages[name], profile, args.build_profile)
+              for profile in args.profile for name in topological_order(packages)]
+    report_plan(plan(builds, skip_reason, history, log_dir), packages, args.cpus)
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build the packages of ConanCenterIndex's recipes concurrently, in dependency order."
+    )
+    parser.add_argument("--profile", "-pr", nargs="+", default=["default"],
+                        help="host profiles, names of the conan home or files such as profile/linux-armv8.")
+    parser.add_argument("--build-profile", default="default", help="build profile.")
+    parser.add_argument("--packages", default=PACKAGES_FILE, help="manifest of the packages to build.")
+    parser.add_argument("--only", nargs="+", metavar="NAME",
+                        help="build only these packages (their requirements must already be in the cache).")
+    parser.add_argument("--cpus", type=int, default=os.cpu_count(),
+                        help="CPU slots shared by all the builds (default: all the CPUs).")
+    parser.add_argument("--jobs", "-j", type=int, default=None,
+                        help="maximum number of `conan create` running at the same time (default: one per 4 CPUs).")
+    parser.add_argument("--memory", type=float, default=None, metavar="GIB",
+                        help="memory shared by all the builds, their build jobs are reduced or delayed to fit into it, "
+                             "according to the peak memory of their previous builds (default: 90%% of the RAM, 0 for no limit).")
+    parser.add_argument("--incremental", action="store_true",
+                        help="skip the packages whose recipe, profiles and requirements did not change since their last build.")
+    parser.add_argument("--resume", action="store_true",
+                        help="skip the builds completed by the previous run, if their recipe, profiles and requirements did not change.")
+    parser.add_argument("--state-dir", default=os.path.join(REPO_ROOT, ".cci_build"),
+                        help="folder receiving the logs, the fingerprints and the telemetry of the builds.")
+    parser.add_argument("--source-cache", metavar="DIR", default=os.environ.get("CCI_SOURCE_CACHE"),
+                        help="serve the upstream archives from this cache of build_tools/source_cache.py "
+                             "(needs the cci_source_cache conan hook).")
+    parser.add_argument("--offline", action="store_true",
+                        help="with --source-cache, fail the builds whose archives are not cached instead of downloading them.")
+    parser.add_argument("--verify-sources", action="store_true",
+                        help="with --source-cache, hash the cached archives of the packages before building, "
+                             "the corrupted ones are removed from the cache.")
+    parser.add_argument("--binary-remote", metavar="REMOTE",
+                        help="conan remote from which the packages are downloaded when it has their package ID, "
+                             "and to which the packages built are uploaded.")
+    parser.add_argument("--binary-store", metavar="DIR",
+                        help="same as --binary-remote, with a folder (e.g. on a shared filesystem) "
+                             "served by a conan_server started for the run.")
+    parser.add_argument("--plan", action="store_true",
+                        help="only print what would be built, the package IDs and the expected duration, "
+                             "according to the telemetry of the previous builds (the recipes are exported).")
+    parser.add_argument("--compiler-launcher", metavar="PROGRAM", default=os.environ.get("CCI_COMPILER_LAUNCHER"),
+                        help="wrap the compilers of the builds with this launcher (ccache, sccache...), "
+                             "its statistics are reset at the start of the run and printed at its end.")
+    parser.add_argument("--regression-threshold", type=float, default=10.0, metavar="PERCENT",
+                        help="report the builds using more time, memory or disk than in the previous run by this percentage.")
+    args = parser.parse_args()
+
+    labels = [profile_label(profile) for profile in args.profile]
+    if len(set(labels)) != len(labels):
+        parser.error(f"host profiles must have different file names: {', '.join(args.profile)}")
+
+    packages = load_packages(args.packages)
+    # Computed on the whole graph, so that --only does not change the fingerprints
+    fingerprint = {}
+    stores = {}
+    for profile in args.profile:
+        options = {name: Build(package, profile, args.build_profile).options for name, package in packages.items()}
+        fingerprint[profile] = fingerprints(packages, options, profile_argument(profile), profile_argument(args.build_profile))
+        stores[profile] = FingerprintStore(os.path.join(args.state_dir, "fingerprints", f"{profile_label(profile)}.json"))
+    if args.only:
+        unknown = set(args.only) - set(packages)
+        if unknown:
+            parser.error(f"not in {args.packages}: {', '.join(sorted(unknown))}")
+        packages = {name: packages[name] for name in args.only}
+        for package in packages.values():
+            package.requires &= set(packages)
+
+    max_jobs = args.jobs or max(1, args.cpus // 4)
+    slots = max(1, args.cpus // max_jobs)
+    log_dir = os.path.join(args.state_dir, "logs")
+    os.makedirs(log_dir, exist_ok=True)
+    if args.source_cache:
+        # Read by the conan hook of the `conan create` processes, with the URL of the server started below
+        os.environ["CCI_SOURCE_CACHE"] = os.path.abspath(args.source_cache)
+        if args.offline:
+            os.environ["CCI_SOURCE_CACHE_OFFLINE"] = "1"
+        if args.verify_sources:
+            archives = [archive for package in packages.values()
+                        for archive in version_sources(package.name, package.version, package.folder)]
+            # A corrupted archive would only fail in source(), possibly after hours of building its requirements
+            _, corrupted = SourceCache(os.path.abspath(args.source_cache)).verify(archives, workers=args.cpus, remove=True)
+            if corrupted:
+                print(f"{len(corrupted)} corrupted archives removed from {args.source_cache}, "
+                      + ("their builds will fail with --offline" if args.offline else "they will be downloaded again"))
+    elif args.offline or args.verify_sources:
+        parser.error("--offline and --verify-sources require --source-cache")
+    history = TelemetryHistory(os.path.join(args.state_dir, "telemetry.jsonl"))
+    if args.plan:
+        return build_plan(args, packages, fingerprint, stores, history, log_dir)
+    journal = CheckpointJournal(os.path.join(args.state_dir, "checkpoint.jsonl"), resume=args.resume)
+    if args.compiler_launcher:
+        try:
+            # The builds run concurrently, the statistics of the cache can only tell the hit rate of the whole run
+            subprocess.run([args.compiler_launcher, "--zero-stats"], stdout=subprocess.DEVNULL, check=True)
+        except (OSError, subprocess.CalledProcessError) as error:
+            parser.error(f"cannot use the compiler launcher {args.compiler_launcher}: {error}")
+        for variable in LAUNCHER_VARIABLES:
+            os.environ[variable] = args.compiler_launcher
+    if args.binary_remote and args.binary_store:
+        parser.error("--binary-remote and --binary-store are exclusive")
+    source_server = None
+    store_server = None
+    remote = None
+
+    def runner(job):
+        if job.key.startswith("export:"):
+            return conan_export(job.payload, log_dir)
+        build = job.payload
+        package = build.package
+        current = fingerprint[build.host_profile][package.name]
+        store = stores[build.host_profile]
+        if args.resume and journal.completed(job.key, package, current):
+            print(f"[{job.key}] completed by the previous run, {package.ref} not rebuilt")
+            return True
+        if args.incremental and store.is_current(package, current):
+            print(f"[{job.key}] up to date, {package.ref} not rebuilt")
+            journal.record(job.key, package, current)
+            return True
+        package_id = download_package(remote, build, log_dir) if remote else None
+        if package_id:
+            print(f"[{job.key}] downloaded from {remote.name}, {package.ref} not rebuilt")
+            store.record(package, current, package_id)
+            journal.record(job.key, package, current)
+            return True
+        built, package_id = conan_create(job, log_dir, history, poll=gates[package.name].poll)
+        if built:
+            store.record(package, current, package_id)
+            journal.record(job.key, package, current)
+            if remote:
+                upload_package(remote, build, package_id, log_dir)
+        return built
+
+    # The servers and the remote are removed whatever stops the run, Ctrl-C included
+    try:
+        if args.source_cache:
+            source_server = serve(os.path.abspath(args.source_cache))
+            os.environ["CCI_SOURCE_CACHE_URL"] = source_server.url
+        if args.binary_store:
+            store_server = StoreServer(args.binary_store)
+            store_server.start()
+            if not add_remote(STORE_REMOTE, store_server.url, store_server.password):
+                parser.error(f"cannot add the remote of {args.binary_store}")
+            remote = BinaryRemote(STORE_REMOTE)
+        elif args.binary_remote:
+            remote = BinaryRemote(args.binary_remote)
+        jobs, gates = build_jobs(packages, args.profile, args.build_profile, slots, history)
+        if args.memory is None:
+            memory_budget = int(physical_memory() * 0.9) if physical_memory() else None
+        else:
+            memory_budget = int(args.memory * (1 << 30)) or None
+        status = Scheduler(jobs, runner, budget=args.cpus, max_jobs=max_jobs, memory_budget=memory_budget).run()
+    finally:
+        if store_server:
+            remove_remote(STORE_REMOTE)
+            store_server.stop()
+        if source_server:
+            source_server.shutdown()
+            source_server.server_close()
+    report(history, args.regression_threshold)
+    if args.compiler_launcher:
+        print(f"{args.compiler_launcher} statistics of the run:", flush=True)
+        subprocess.run([args.compiler_launcher, "--show-stats"])
+
+    failed = sorted(key for key, result in status.items() if result != SUCCESS)
+    if failed:
+        print(f"Not built: {', '.join(f'{key} ({status[key]})' for key in failed)}")
+        print(f"Rerun with --resume to build only these, {len(journal)} builds are kept in {journal.path}")
+        return 1
+    journal.clear()
+    print(f"Built {len(packages)} packages for {', '.join(args.profile)}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
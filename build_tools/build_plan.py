@@ -0,0 +1,113 @@
+"""
+
+Dry run of the build driver: which packages a run would build or reuse, their
+package IDs and the time it should take according to the telemetry history
+
+"""
+
+import concurrent.futures
+import json
+import os
+import subprocess
+import tempfile
+
+from build_tools.conan_cache import binary_in_local_cache
+from build_tools.recipe_graph import critical_path
+
+
+BUILD = "build"
+
+
+def package_id(build, log_path):
+    """ Package ID of a build computed by `conan info` (the recipe must be exported), None on failure """
+    with tempfile.TemporaryDirectory() as folder:
+        output = os.path.join(folder, "info.json")
+        with open(log_path, "w") as log:
+            returncode = subprocess.run(build.info_command(output), stdout=log, stderr=subprocess.STDOUT).returncode
+        if returncode != 0 or not os.path.isfile(output):
+            return None
+        with open(output) as f:
+            nodes = json.load(f)
+    for node in nodes:
+        if node.get("reference", "").split("@")[0] == build.package.ref:
+            return node.get("id")
+    return None
+
+
+def binary_in_cache(build, pid):
+    return binary_in_local_cache(build.package, pid)
+
+
+class PlannedBuild(object):
+
+    def __init__(self, build, action, pid, estimate):
+        self.build = build
+        self.action = action  # BUILD or the reason why it is skipped
+        self.package_id = pid
+        self.estimate = estimate  # last successful telemetry record, None if never built
+
+    @property
+    def wall(self):
+        return self.estimate["wall"] if self.estimate and self.action == BUILD else 0.0
+
+    @property
+    def cpu(self):
+        if not self.estimate or self.action != BUILD:
+            return 0.0
+        return self.estimate["user"] + self.estimate["system"]
+
+
+def plan(builds, skip_reason, history, log_dir, workers=8):
+    """ PlannedBuild of each build, `skip_reason(build)` tells why the driver would not build it, if so """
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        pids = executor.map(lambda build: package_id(build, os.path.splitext(build.log_file(log_dir))[0] + "-info.log"),
+                            builds)
+        planned = []
+        for build, pid in zip(builds, pids):
+            label = os.path.basename(build.host_profile)
+            planned.append(PlannedBuild(build, skip_reason(build) or BUILD, pid,
+                                        history.estimate(build.package.ref, label)))
+    return planned
+
+
+def _minutes(seconds):
+    return f"{seconds / 60:.0f} min" if seconds >= 60 else f"{seconds:.0f} s"
+
+
+def report_plan(planned, packages, cpus, log=print):
+    """ Prints the planned builds, the critical path of each profile and the expected duration of the run """
+    log(f"{'package':<32} {'profile':<24} {'package id':<42} {'binary':<10} {'estimate':>10}  action")
+    for entry in planned:
+        build = entry.build
+        estimate = "-" if entry.action != BUILD else _minutes(entry.wall) if entry.estimate else "unknown"
+        log(f"{build.package.ref:<32} {os.path.basename(build.host_profile):<24} {entry.package_id or '?':<42} "
+            f"{'in cache' if binary_in_cache(build, entry.package_id) else 'missing':<10} {estimate:>10}  {entry.action}")
+
+    to_build = [entry for entry in planned if entry.action == BUILD]
+    unknown = [entry for entry in to_build if not entry.estimate]
+    longest = 0.0
+    profiles = []
+    for entry in planned:
+        if entry.build.host_profile not in profiles:
+            profiles.append(entry.build.host_profile)
+    for profile in profiles:
+        cost = {entry.build.package.name: entry.wall for entry in planned if entry.build.host_profile == profile}
+        length = critical_path(packages, cost)
+        chain = [max(length, key=lambda name: (length[name], name))]
+        dependents = [name for name, package in packages.items() if chain[-1] in package.requires]
+        while dependents:
+            chain.append(max(dependents, key=lambda name: (length[name], name)))
+            dependents = [name for name, package in packages.items() if chain[-1] in package.requires]
+        longest = max(longest, length[chain[0]])
+        if not length[chain[0]]:
+            log(f"Critical path for {os.path.basename(profile)}: no estimate")
+            continue
+        log(f"Critical path for {os.path.basename(profile)}: {' -> '.join(chain)} ({_minutes(length[chain[0]])}), "
+            f"{max(chain, key=lambda name: cost.get(name, 0))} dominates it")
+
+    # Neither the chain of dependencies nor the CPUs can be shortened
+    duration = max(longest, sum(entry.cpu for entry in to_build) / max(1, cpus))
+    log(f"{len(to_build)} builds, {len(planned) - len(to_build)} skipped, about {_minutes(duration)} with {cpus} CPUs")
+    if unknown:
+        log(f"Never built, not estimated: {', '.join(sorted(entry.build.key for entry in unknown))}")
+    return duration
@@ -0,0 +1,65 @@
+"""
+
+Journal of the builds completed by a run, so that a failed or interrupted run
+can be resumed without creating again what it already built
+
+"""
+
+import json
+import os
+import threading
+
+from build_tools.conan_cache import in_local_cache
+
+
+class CheckpointJournal(object):
+    """ JSON-lines file with one entry per successful `conan create`, written as soon as it finishes """
+
+    def __init__(self, path, resume=False):
+        """
+        :param resume: keep the entries of the previous run, otherwise the journal starts empty
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries = {}
+        if resume:
+            try:
+                with open(path) as f:
+                    for line in f:
+                        try:
+                            entry = json.loads(line)
+                        except ValueError:
+                            continue  # Last line of a run killed while writing it
+                        self._entries[entry["key"]] = entry
+            except IOError:
+                pass
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            for entry in self._entries.values():
+                f.write(json.dumps(entry, sort_keys=True) + "\n")
+
+    def __len__(self):
+        return len(self._entries)
+
+    def completed(self, key, package, fingerprint):
+        """ True if the build was completed by the journaled run with the same fingerprint,
+            and its package is still in the conan cache """
+        entry = self._entries.get(key)
+        return bool(entry) and entry["ref"] == package.ref and entry["fingerprint"] == fingerprint \
+            and in_local_cache(package)
+
+    def record(self, key, package, fingerprint):
+        entry = {"key": key, "ref": package.ref, "fingerprint": fingerprint}
+        with self._lock:
+            self._entries[key] = entry
+            with open(self.path, "a") as f:
+                f.write(json.dumps(entry, sort_keys=True) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+    def clear(self):
+        """ Removes the journal, once the run has built everything there is nothing to resume """
+        with self._lock:
+            self._entries = {}
+            if os.path.exists(self.path):
+                os.remove(self.path)
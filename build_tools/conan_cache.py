@@ -0,0 +1,44 @@
+"""
+
+Read-only queries on the local conan cache (Conan 1.x layout)
+
+"""
+
+import os
+
+
+def conan_home():
+    return os.path.join(os.environ.get("CONAN_USER_HOME", os.path.expanduser("~")), ".conan")
+
+
+def profile_path(profile):
+    """ File of a profile given either as a path or as a name of the conan home """
+    if os.path.isfile(profile):
+        return profile
+    candidate = os.path.join(conan_home(), "profiles", profile)
+    return candidate if os.path.isfile(candidate) else None
+
+
+def reference_folder(package):
+    return os.path.join(conan_home(), "data", package.name, package.version, "_", "_")
+
+
+def in_local_cache(package):
+    """ Whether the conan cache holds at least one binary of the package """
+    folder = os.path.join(reference_folder(package), "package")
+    return os.path.isdir(folder) and bool(os.listdir(folder))
+
+
+def binary_in_local_cache(package, package_id):
+    """ Whether the conan cache holds the binary `package_id` of the package """
+    return bool(package_id) and os.path.isdir(os.path.join(reference_folder(package), "package", package_id))
+
+
+def source_ready(package):
+    """ Whether the sources of the recipe are unpacked in the cache
+
+    The source folder is shared by all the binaries of a reference, Conan flags it
+    with a `source.dirty` file while source() is running.
+    """
+    folder = os.path.join(reference_folder(package), "source")
+    return os.path.isdir(folder) and not os.path.exists(f"{folder}.dirty")
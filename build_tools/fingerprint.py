@@ -0,0 +1,101 @@
+"""
+
+Content fingerprints of the recipes, to skip the `conan create` of packages
+whose inputs did not change since their last successful build
+
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+from build_tools.conan_cache import binary_in_local_cache, profile_path
+from build_tools.recipe_graph import topological_order
+
+
+_IGNORED_DIRS = ("__pycache__", "build", "test_output")
+
+
+def _hash_file(sha, path):
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            sha.update(chunk)
+
+
+def hash_tree(sha, folder):
+    """ Feeds the relative path and content of every file below `folder`, in a stable order """
+    for root, dirs, files in os.walk(folder):
+        dirs[:] = sorted(d for d in dirs if d not in _IGNORED_DIRS)
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            sha.update(os.path.relpath(path, folder).replace(os.sep, "/").encode())
+            sha.update(b"\0")
+            _hash_file(sha, path)
+            sha.update(b"\0")
+
+
+def profile_fingerprint(profile):
+    sha = hashlib.sha256()
+    path = profile_path(profile)
+    if path:
+        _hash_file(sha, path)
+    else:
+        sha.update(profile.encode())
+    return sha.hexdigest()
+
+
+def recipe_fingerprint(package, options, profiles, requires_fingerprints):
+    """ Hash of everything `conan create` of a package depends on in this repository
+
+    :param options: options passed on the command line
+    :param profiles: fingerprints of the host and build profiles
+    :param requires_fingerprints: fingerprints of the requirements built from this index,
+                                  so that a change in eigen also rebuilds ceres-solver
+    """
+    sha = hashlib.sha256()
+    sha.update(package.ref.encode())
+    hash_tree(sha, os.path.join(package.recipe_dir, package.folder))
+    sha.update(json.dumps({"options": options, "profiles": profiles,
+                           "requires": requires_fingerprints}, sort_keys=True).encode())
+    return sha.hexdigest()
+
+
+def fingerprints(packages, options, host_profile, build_profile):
+    """ {name: fingerprint} of all the packages, `options` is {name: options of the package} """
+    profiles = [profile_fingerprint(host_profile), profile_fingerprint(build_profile)]
+    result = {}
+    for name in topological_order(packages):
+        package = packages[name]
+        requires = {dep: result[dep] for dep in package.requires}
+        result[name] = recipe_fingerprint(package, options[name], profiles, requires)
+    return result
+
+
+class FingerprintStore(object):
+    """ Fingerprint and package ID of the last successful build of each package reference, per host profile """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            with open(path) as f:
+                self._entries = json.load(f)
+        except (IOError, ValueError):
+            self._entries = {}
+
+    def is_current(self, package, fingerprint):
+        """ True if the last build had the same fingerprint and its binary is still in the conan cache,
+            the cache may hold other binaries of the reference built with other options """
+        entry = self._entries.get(package.ref)
+        return isinstance(entry, dict) and entry.get("fingerprint") == fingerprint \
+            and binary_in_local_cache(package, entry.get("package_id"))
+
+    def record(self, package, fingerprint, package_id):
+        with self._lock:
+            self._entries[package.ref] = {"fingerprint": fingerprint, "package_id": package_id}
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "w") as f:
+                json.dump(self._entries, f, indent=2, sort_keys=True)
+            os.replace(tmp, self.path)
@@ -0,0 +1,62 @@
+"""
+
+Conan hook serving the sources of the recipes from the cache of
+build_tools/source_cache.py instead of their upstream URLs.
+
+Install it with:
+
+    conan config install build_tools/hooks -tf hooks
+    conan config set hooks.cci_source_cache
+
+It is only active when CCI_SOURCE_CACHE (folder of the cache) and
+CCI_SOURCE_CACHE_URL (where it is served, e.g. http://127.0.0.1:8765) are
+defined. With CCI_SOURCE_CACHE_OFFLINE=1, archives missing from the cache
+make source() fail instead of being downloaded.
+
+"""
+
+import os
+
+from conans.errors import ConanException
+
+
+def _cached_file(root, sha256):
+    folder = os.path.join(root, sha256[:2], sha256)
+    if os.path.isdir(folder):
+        for name in os.listdir(folder):
+            if not name.startswith("."):
+                return f"{sha256[:2]}/{sha256}/{name}"
+    return None
+
+
+def _serve_from_cache(output, conanfile):
+    """ Points the sources of conan_data at the cache """
+    root = os.environ.get("CCI_SOURCE_CACHE")
+    url = os.environ.get("CCI_SOURCE_CACHE_URL")
+    conan_data = getattr(conanfile, "conan_data", None)
+    if not root or not url or not conan_data or "sources" not in conan_data:
+        return
+    offline = os.environ.get("CCI_SOURCE_CACHE_OFFLINE") == "1"
+
+    entries = conan_data["sources"].get(str(conanfile.version))
+    if entries is None:
+        return
+    for entry in entries if isinstance(entries, list) else [entries]:
+        sha256 = entry.get("sha256")
+        cached = _cached_file(root, sha256) if sha256 else None
+        if cached:
+            # get() keeps checking the sha256 of what it downloads
+            entry["url"] = f"{url.rstrip('/')}/{cached}"
+            output.info(f"[SOURCE CACHE] {cached}")
+        elif offline:
+            raise ConanException(f"[SOURCE CACHE] {entry.get('url')} is not cached in {root}, run "
+                                 f"`python3 -m build_tools.source_cache prefetch {conanfile.name}`")
+
+
+def pre_source(output, conanfile, conanfile_path, **kwargs):
+    _serve_from_cache(output, conanfile)
+
+
+def pre_build(output, conanfile, **kwargs):
+    # Archives that only some options need (opencv_contrib) are fetched by build(), the source folder is shared
+    _serve_from_cache(output, conanfile)
@@ -0,0 +1,18 @@
+"""
+
+Folders of the repository, shared by the modules reading its recipes
+
+"""
+
+import os
+
+import yaml
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RECIPES_DIR = os.path.join(REPO_ROOT, "recipes")
+
+
+def load_yaml(path):
+    with open(path) as f:
+        return yaml.safe_load(f)
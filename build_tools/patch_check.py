@@ -0,0 +1,194 @@
+"""
+
+Dry run of the patches of conandata.yml against the archives of the source cache,
+so that a patch which no longer applies is found before a build reaches source().
+
+    python3 -m build_tools.patch_check [opencv qt ...] --jobs 8
+
+For each version, the archives are read once as a stream and only the files the
+patches modify are extracted, into a scratch folder, where the patches are applied
+with patch_ng, as conan does. The failures are printed as GitHub annotations on the
+conandata.yml line of the patch.
+
+Recipes extract their sources in different ways (source_subfolder, qt5...), so the
+base_path of a patch is tried as declared and without its first folder, in each
+archive of the version.
+
+"""
+
+import argparse
+import concurrent.futures
+import io
+import logging
+import os
+import posixpath
+import sys
+import tarfile
+import tempfile
+import zipfile
+
+from build_tools.recipe_index import ERROR, WARNING, Problem, RecipeIndex
+from build_tools.source_cache import DEFAULT_CACHE, SourceCache, source_archives
+
+
+TITLE = "patch check"
+
+
+def _patched_files(patchset):
+    """ Files a patch modifies, relative to its root: new files need nothing from the archive """
+    files = []
+    for item in patchset.items:
+        source = patchset.decode_clean(item.source, "a/")
+        target = patchset.decode_clean(item.target, "b/")
+        if "dev/null" not in source and "dev/null" not in target:
+            files.extend({source, target})
+    return files
+
+
+def _base_paths(base_path):
+    """ The base_path as declared, then relative to the folder the recipe extracts the archive to """
+    base_path = (base_path or "").strip("/")
+    candidates = [base_path]
+    if base_path:
+        candidates.append(base_path.partition("/")[2])
+    return list(dict.fromkeys(candidates))
+
+
+def _strip_root(name):
+    """ Member name without the top folder of the archive, as get(strip_root=True) """
+    return name.partition("/")[2]
+
+
+def extract_members(archive, wanted, destination):
+    """ Extracts the members of a tar or zip archive whose path without the top folder is in `wanted`,
+        reading the archive once as a stream. Returns the paths found """
+    found = set()
+    if zipfile.is_zipfile(archive):
+        with zipfile.ZipFile(archive) as z:
+            for info in z.infolist():
+                name = _strip_root(info.filename)
+                if name in wanted and not info.is_dir():
+                    _write(destination, name, z.read(info))
+                    found.add(name)
+        return found
+    with tarfile.open(archive, mode="r|*") as tar:
+        for member in tar:
+            name = _strip_root(posixpath.normpath(member.name))
+            if name in wanted and member.isfile():
+                _write(destination, name, tar.extractfile(member).read())
+                found.add(name)
+    return found
+
+
+def _write(destination, name, data):
+    path = os.path.join(destination, *name.split("/"))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def _apply(patch_path, root):
+    """ (success, messages of patch_ng) of a patch applied like conan's patch() """
+    import patch_ng
+
+    stream = io.StringIO()
+    handler = logging.StreamHandler(stream)
+    logger = logging.getLogger("patch_ng")
+    logger.addHandler(handler)
+    try:
+        patchset = patch_ng.fromfile(patch_path)
+        if not patchset:
+            return False, "cannot parse the patch"
+        return patchset.apply(root=root), stream.getvalue()
+    finally:
+        logger.removeHandler(handler)
+
+
+def _apply_somewhere(patch_path, base_path, files, roots):
+    """ Applies a patch in the first root where it finds its files, returns (success, messages of the last attempt) """
+    messages = ""
+    for root, found in roots:
+        for base in _base_paths(base_path):
+            if all(posixpath.join(base, f) in found for f in files):
+                applied, messages = _apply(patch_path, os.path.join(root, base))
+                if applied:
+                    return True, messages
+    return False, messages
+
+
+def check_version(name, version, folder, archives, patches):
+    """ [(index of the patch, error message)] of the patches of a version, `archives` are their cached paths """
+    import patch_ng
+
+    failures = []
+    wanted = set()
+    parsed = []
+    for i, patch in enumerate(patches):
+        patch_path = os.path.join(folder, patch["patch_file"])
+        patchset = patch_ng.fromfile(patch_path) if os.path.isfile(patch_path) else None
+        if not patchset:
+            failures.append((i, f"cannot read {patch['patch_file']}"))
+            continue
+        files = _patched_files(patchset)
+        parsed.append((i, patch, patch_path, files))
+        for base in _base_paths(patch.get("base_path")):
+            wanted.update(posixpath.join(base, f) for f in files)
+
+    with tempfile.TemporaryDirectory(prefix="cci_patch_check_") as scratch:
+        roots = []
+        for n, archive in enumerate(archives):
+            root = os.path.join(scratch, str(n))
+            os.makedirs(root)
+            roots.append((root, extract_members(archive, wanted, root)))
+        # Patches apply in order, each one on the result of the previous ones
+        for i, patch, patch_path, files in parsed:
+            applied, messages = _apply_somewhere(patch_path, patch.get("base_path"), files, roots)
+            if not applied:
+                details = messages.strip().replace("\n", "%0A") or "the files it modifies are not in the sources"
+                failures.append((i, f"{patch['patch_file']} does not apply: {details}"))
+    return sorted(failures)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dry run the patches of the recipes against the cached source archives.")
+    parser.add_argument("names", nargs="*", help="recipes to check (default: all).")
+    parser.add_argument("--cache", default=DEFAULT_CACHE, help="folder of the source cache (default: $CCI_SOURCE_CACHE or .cci_build/sources).")
+    parser.add_argument("--jobs", "-j", type=int, default=os.cpu_count(), help="versions checked at the same time.")
+    args = parser.parse_args()
+
+    index = RecipeIndex.load(args.names or None)
+    cache = SourceCache(args.cache)
+    problems = []
+    checked = 0
+    with concurrent.futures.ProcessPoolExecutor(max_workers=args.jobs) as executor:
+        futures = {}
+        for recipe in index.versions():
+            if not recipe.patches or recipe.sources is None:
+                continue
+            line = recipe.folder.lines.get(("patches", recipe.version))
+            archives = [cache.lookup(archive.sha256) if archive.sha256 else None
+                        for archive in source_archives(recipe.name, recipe.version, recipe.sources)]
+            if not all(archives):
+                problems.append(Problem(WARNING, recipe.folder.conandata_path, line,
+                                        f"{recipe.ref}: sources not cached, run `python3 -m build_tools.source_cache "
+                                        f"prefetch {recipe.name}` to check its patches", TITLE))
+                continue
+            futures[executor.submit(check_version, recipe.name, recipe.version, recipe.folder.path,
+                                    archives, recipe.patches)] = recipe
+        for future in concurrent.futures.as_completed(futures):
+            recipe = futures[future]
+            checked += 1
+            for i, message in future.result():
+                line = recipe.folder.lines.get(("patches", recipe.version, i))
+                problems.append(Problem(ERROR, recipe.folder.conandata_path, line, f"{recipe.ref}: {message}", TITLE))
+
+    problems.sort(key=lambda problem: (problem.path, problem.line or 0))
+    for problem in problems:
+        print(problem.annotation())
+    errors = sum(1 for problem in problems if problem.level == ERROR)
+    print(f"{checked} versions checked, {errors} patches do not apply", file=sys.stderr)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,159 @@
+"""
+
+Dependency graph of the packages listed in build_tools/packages.yml
+
+"""
+
+import ast
+import os
+import platform
+import sys
+
+from build_tools.layout import REPO_ROOT, RECIPES_DIR, load_yaml
+from build_tools.recipe_index import ERROR, RecipeIndex
+
+
+PACKAGES_FILE = os.path.join(REPO_ROOT, "build_tools", "packages.yml")
+
+_REQUIRES_METHODS = ("requires", "build_requires", "tool_requires")
+
+
+class Package(object):
+    """ One `conan create` of the index: a recipe version plus its options """
+
+    def __init__(self, name, version, folder, options=None, cross_options=None):
+        self.name = name
+        self.version = version
+        self.folder = folder
+        self.options = options or {}
+        self.cross_options = cross_options or {}
+        self.requires = set()
+
+    @property
+    def ref(self):
+        return f"{self.name}/{self.version}"
+
+    @property
+    def recipe_dir(self):
+        return os.path.join(RECIPES_DIR, self.name)
+
+    @property
+    def conanfile(self):
+        return os.path.join(self.recipe_dir, self.folder, "conanfile.py")
+
+    def __repr__(self):
+        return f"<Package {self.ref}>"
+
+
+def recipe_folder(name, version, index=None):
+    """ Folder of recipes/<name> holding <version>, as declared in config.yml, if the version can be built """
+    index = index or RecipeIndex.load([name])
+    recipe = index.get(name, version)
+    if recipe is not None and recipe.buildable:
+        return recipe.folder.folder
+    ref = f"{name}/{version}"
+    problems = [problem.message for problem in index.problems()
+                if problem.level == ERROR and problem.message.startswith(f"{ref}:")]
+    raise ValueError(problems[0] if problems else f"{ref} is not listed in recipes/{name}/config.yml")
+
+
+def _literal_refs(node, dynamic):
+    """ Yield every string constant of an expression such as "a/1.0" or ("a/1.0", "b/2.0"),
+        the other expressions, such as f-strings, are appended to `dynamic` """
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        yield node.value
+    elif isinstance(node, (ast.Tuple, ast.List)):
+        for element in node.elts:
+            yield from _literal_refs(element, dynamic)
+    else:
+        dynamic.append(node)
+
+
+def declared_requirements(conanfile):
+    """ Names of all the packages a conanfile.py may require
+
+    This is a static scan: every literal reference passed to self.requires(),
+    self.build_requires() and self.tool_requires(), or assigned to the class
+    attributes of the same names, is reported, whatever the condition guarding it.
+    The references computed at runtime cannot be read, they are reported on stderr.
+    """
+    with open(conanfile) as f:
+        tree = ast.parse(f.read(), filename=conanfile)
+
+    refs = []
+    dynamic = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) \
+           and node.func.attr in _REQUIRES_METHODS and node.args:
+            refs.extend(_literal_refs(node.args[0], dynamic))
+        elif isinstance(node, ast.ClassDef):
+            for statement in node.body:
+                if isinstance(statement, ast.Assign):
+                    for target in statement.targets:
+                        if isinstance(target, ast.Name) and target.id in _REQUIRES_METHODS:
+                            refs.extend(_literal_refs(statement.value, dynamic))
+    for node in dynamic:
+        print(f"{os.path.relpath(conanfile)}:{node.lineno}: warning: the requirement is not a string literal, "
+              "it is left out of the dependency graph", file=sys.stderr)
+    return {ref.split("/")[0] for ref in refs}
+
+
+def load_packages(packages_file=PACKAGES_FILE, build_os=None):
+    """ Packages of the manifest to build on this machine, with their requirements resolved """
+    build_os = build_os or platform.system()
+    entries = [entry for entry in load_yaml(packages_file)["packages"]
+               if "build_os" not in entry or build_os in entry["build_os"]]
+    # The config.yml and conandata.yml of the recipes of the manifest, read once
+    index = RecipeIndex.load(sorted({entry["ref"].split("/")[0] for entry in entries}))
+    packages = {}
+    for entry in entries:
+        name, version = entry["ref"].split("/")
+        packages[name] = Package(name, version, recipe_folder(name, version, index),
+                                 options=entry.get("options"),
+                                 cross_options=entry.get("cross_options"))
+
+    for package in packages.values():
+        # Requirements outside of the manifest are resolved from the remotes
+        package.requires = {name for name in declared_requirements(package.conanfile)
+                            if name in packages and name != package.name}
+    return packages
+
+
+def topological_order(packages):
+    """ Package names ordered so that every package comes after its requirements """
+    order = []
+    state = {}
+
+    def visit(name, stack):
+        if state.get(name) == "done":
+            return
+        if state.get(name) == "visiting":
+            cycle = " -> ".join(stack + [name])
+            raise ValueError(f"Dependency cycle between recipes: {cycle}")
+        state[name] = "visiting"
+        for dep in sorted(packages[name].requires):
+            visit(dep, stack + [name])
+        state[name] = "done"
+        order.append(name)
+
+    for name in sorted(packages):
+        visit(name, [])
+    return order
+
+
+def critical_path(packages, cost=None):
+    """ Length of the longest chain of builds starting at each package
+
+    `cost` maps a package name to its expected build cost, every build costs 1 by default.
+    """
+    cost = cost or {}
+    dependents = {name: set() for name in packages}
+    for name, package in packages.items():
+        for dep in package.requires:
+            dependents[dep].add(name)
+
+    length = {}
+    for name in reversed(topological_order(packages)):
+        downstream = max((length[d] for d in dependents[name]), default=0)
+        length[name] = cost.get(name, 1) + downstream
+    return length
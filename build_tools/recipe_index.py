@@ -0,0 +1,269 @@
+"""
+
+In-memory index of the recipes: name -> version -> folder, with the sources and
+patches of the conandata.yml of the folder and the files on disk, loaded once.
+
+As a library, it enumerates the versions that can be built without reading the
+YAML files again:
+
+    index = RecipeIndex.load()
+    for recipe in index.buildable():
+        print(recipe.ref, recipe.folder)
+
+As a linter, it checks in one pass that the config.yml, conandata.yml and folders
+of the recipes agree, and prints GitHub annotations:
+
+    python3 -m build_tools.recipe_index [recipes/qt ...]
+
+"""
+
+import argparse
+import os
+import sys
+
+import yaml
+
+from build_tools.layout import RECIPES_DIR
+
+
+ERROR = "error"
+WARNING = "warning"
+
+
+def _convert(node, path, lines):
+    """ Plain data of a YAML node, every scalar kept as written: versions such as 1.10 must not become
+        floats. `lines` receives the line of each key and sequence item, by its path of keys and indexes """
+    if isinstance(node, yaml.MappingNode):
+        mapping = {}
+        for key, value in node.value:
+            lines[path + (key.value,)] = key.start_mark.line + 1
+            mapping[key.value] = _convert(value, path + (key.value,), lines)
+        return mapping
+    if isinstance(node, yaml.SequenceNode):
+        sequence = []
+        for i, item in enumerate(node.value):
+            lines[path + (i,)] = item.start_mark.line + 1
+            sequence.append(_convert(item, path + (i,), lines))
+        return sequence
+    return node.value
+
+
+def load_with_lines(path):
+    """ (data, lines) of a YAML file, see _convert """
+    with open(path) as f:
+        node = yaml.compose(f, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader))
+    lines = {}
+    return (_convert(node, (), lines) if node is not None else None), lines
+
+
+class Problem(object):
+    """ Inconsistency found by the index, printed as a GitHub annotation """
+
+    def __init__(self, level, path, line, message, title="recipe consistency"):
+        self.level = level
+        self.path = path
+        self.line = line
+        self.message = message
+        self.title = title
+
+    def annotation(self):
+        location = f"file={os.path.relpath(self.path)}" + (f",line={self.line}" if self.line else "")
+        return f"::{self.level} {location},title={self.title} {self.level}::{self.message}"
+
+
+class RecipeFolder(object):
+    """ A folder of recipes/<name> (all, 5.x.x...), its conandata.yml and its files """
+
+    def __init__(self, name, folder):
+        self.name = name
+        self.folder = folder
+        self.path = os.path.join(RECIPES_DIR, name, folder)
+        self.conandata_path = os.path.join(self.path, "conandata.yml")
+        self.exists = os.path.isdir(self.path)
+        self.has_conanfile = os.path.isfile(os.path.join(self.path, "conanfile.py"))
+        self.sources = {}
+        self.patches = {}
+        self.lines = {}
+        self.load_error = None
+        if os.path.isfile(self.conandata_path):
+            try:
+                conandata, self.lines = load_with_lines(self.conandata_path)
+                conandata = conandata if isinstance(conandata, dict) else {}
+                self.sources = conandata.get("sources") or {}
+                self.patches = conandata.get("patches") or {}
+            except yaml.YAMLError as error:
+                self.load_error = str(error)
+
+    def patch_files(self):
+        """ Files of the patches folder, relative to the recipe folder like the patch_file entries """
+        folder = os.path.join(self.path, "patches")
+        files = []
+        for root, _, names in os.walk(folder):
+            files.extend(os.path.relpath(os.path.join(root, name), self.path).replace(os.sep, "/") for name in names)
+        return sorted(files)
+
+
+class RecipeVersion(object):
+    """ A version listed in recipes/<name>/config.yml """
+
+    def __init__(self, name, version, folder, line=None):
+        self.name = name
+        self.version = version
+        self.folder = folder  # RecipeFolder
+        self.line = line
+
+    @property
+    def ref(self):
+        return f"{self.name}/{self.version}"
+
+    @property
+    def conanfile(self):
+        return os.path.join(self.folder.path, "conanfile.py")
+
+    @property
+    def sources(self):
+        return self.folder.sources.get(self.version)
+
+    @property
+    def patches(self):
+        return self.folder.patches.get(self.version) or []
+
+    @property
+    def buildable(self):
+        return self.folder.has_conanfile and self.sources is not None
+
+    def __repr__(self):
+        return f"<RecipeVersion {self.ref} {self.folder.folder}>"
+
+
+class RecipeIndex(object):
+    """ Every recipe of the index, loaded once """
+
+    def __init__(self):
+        self.recipes = {}  # name -> {version: RecipeVersion}
+        self.folders = {}  # (name, folder) -> RecipeFolder
+        self.config_problems = []
+
+    @classmethod
+    def load(cls, names=None):
+        index = cls()
+        for name in sorted(names or os.listdir(RECIPES_DIR)):
+            if os.path.isdir(os.path.join(RECIPES_DIR, name)):
+                index._load_recipe(name)
+        return index
+
+    def _folder(self, name, folder):
+        if (name, folder) not in self.folders:
+            self.folders[(name, folder)] = RecipeFolder(name, folder)
+        return self.folders[(name, folder)]
+
+    def _load_recipe(self, name):
+        recipe_dir = os.path.join(RECIPES_DIR, name)
+        config_path = os.path.join(recipe_dir, "config.yml")
+        versions = self.recipes.setdefault(name, {})
+        for folder in sorted(os.listdir(recipe_dir)):
+            if os.path.isfile(os.path.join(recipe_dir, folder, "conanfile.py")):
+                self._folder(name, folder)
+        if not os.path.isfile(config_path):
+            self.config_problems.append(Problem(ERROR, recipe_dir, None, f"{name} has no config.yml"))
+            return
+        try:
+            config, lines = load_with_lines(config_path)
+        except yaml.YAMLError as error:
+            self.config_problems.append(Problem(ERROR, config_path, None, f"Cannot read config.yml: {error}"))
+            return
+        entries = config.get("versions") if isinstance(config, dict) else None
+        for version, entry in (entries or {}).items():
+            line = lines.get(("versions", version))
+            if not isinstance(entry, dict) or "folder" not in entry:
+                self.config_problems.append(Problem(ERROR, config_path, line, f"{name}/{version} has no folder"))
+                continue
+            versions[version] = RecipeVersion(name, version, self._folder(name, entry["folder"]), line)
+
+    def versions(self, name=None):
+        """ RecipeVersion of a recipe, or of all of them, in the order of config.yml """
+        names = [name] if name else sorted(self.recipes)
+        return [recipe for name in names for recipe in self.recipes.get(name, {}).values()]
+
+    def get(self, name, version):
+        return self.recipes.get(name, {}).get(version)
+
+    def buildable(self, name=None):
+        """ Versions whose folder has a conanfile.py and sources for them in its conandata.yml """
+        return [recipe for recipe in self.versions(name) if recipe.buildable]
+
+    def problems(self):
+        """ Inconsistencies between the config.yml files, the conandata.yml files and the folders """
+        problems = list(self.config_problems)
+        for recipe in self.versions():
+            config_path = os.path.join(RECIPES_DIR, recipe.name, "config.yml")
+            folder = recipe.folder
+            if not folder.exists:
+                problems.append(Problem(ERROR, config_path, recipe.line,
+                                        f"{recipe.ref}: folder {folder.folder} does not exist"))
+            elif not folder.has_conanfile:
+                problems.append(Problem(ERROR, config_path, recipe.line,
+                                        f"{recipe.ref}: folder {folder.folder} has no conanfile.py"))
+            elif recipe.sources is None and not folder.load_error:
+                problems.append(Problem(ERROR, config_path, recipe.line,
+                                        f"{recipe.ref}: no sources in {folder.folder}/conandata.yml"))
+
+        for (name, folder_name), folder in sorted(self.folders.items()):
+            if folder.load_error:
+                problems.append(Problem(ERROR, folder.conandata_path, None, f"Cannot read conandata.yml: {folder.load_error}"))
+                continue
+            if not folder.exists:
+                continue
+            listed = {version for version, recipe in self.recipes.get(name, {}).items() if recipe.folder is folder}
+            if not listed:
+                problems.append(Problem(WARNING, folder.path, None,
+                                        f"{name}/{folder_name} is not the folder of any version of config.yml"))
+            for section, entries in (("sources", folder.sources), ("patches", folder.patches)):
+                for version in entries:
+                    if listed and version not in listed:
+                        problems.append(Problem(WARNING, folder.conandata_path, folder.lines.get((section, version)),
+                                                f"{section} of {name}/{version}, not listed in config.yml for {folder_name}"))
+            referenced = set()
+            for version, patches in folder.patches.items():
+                for i, patch in enumerate(patches if isinstance(patches, list) else []):
+                    patch_file = patch.get("patch_file") if isinstance(patch, dict) else None
+                    if not patch_file:
+                        continue
+                    referenced.add(os.path.normpath(patch_file).replace(os.sep, "/"))
+                    if not os.path.isfile(os.path.join(folder.path, patch_file)):
+                        problems.append(Problem(ERROR, folder.conandata_path, folder.lines.get(("patches", version, i)),
+                                                f"{name}/{version}: {patch_file} does not exist"))
+            if folder.has_conanfile:
+                with open(os.path.join(folder.path, "conanfile.py")) as f:
+                    conanfile = f.read()
+                for patch_file in folder.patch_files():
+                    # Some recipes apply patches from their conanfile.py instead of conandata.yml
+                    if patch_file not in referenced and os.path.basename(patch_file) not in conanfile:
+                        problems.append(Problem(WARNING, os.path.join(folder.path, patch_file), None,
+                                                f"{patch_file} is not used by {name}/{folder_name}"))
+        return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check that the config.yml, conandata.yml and folders of the recipes agree."
+    )
+    parser.add_argument("recipes", nargs="*", help="recipes/<name> folders or names (default: every recipe).")
+    parser.add_argument("--list", action="store_true", help="print the buildable versions instead.")
+    args = parser.parse_args()
+
+    index = RecipeIndex.load([os.path.basename(os.path.normpath(recipe)) for recipe in args.recipes] or None)
+    if args.list:
+        for recipe in index.buildable():
+            print(f"{recipe.ref} {recipe.folder.folder}")
+        return 0
+    problems = index.problems()
+    for problem in problems:
+        print(problem.annotation())
+    errors = sum(1 for problem in problems if problem.level == ERROR)
+    print(f"{len(index.versions())} versions, {errors} errors, {len(problems) - errors} warnings", file=sys.stderr)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
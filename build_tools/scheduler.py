@@ -0,0 +1,141 @@
+"""
+
+Run a graph of jobs concurrently under a budget of CPU slots, and optionally of memory
+
+"""
+
+import concurrent.futures
+import traceback
+
+
+GATE_POLL_INTERVAL = 1.0
+
+SUCCESS = "success"
+FAILED = "failed"
+SKIPPED = "skipped"
+
+
+class Job(object):
+    """ A node of the graph: runs once all of its `deps` have succeeded
+
+    `slots` is the number of CPUs the job keeps busy while running and `priority`
+    the length of the critical path it starts, jobs on longer paths are started first.
+    `memory` is the memory in bytes the job is expected to use per slot, with a memory
+    budget the scheduler may give the job less slots than requested to fit into it,
+    `slots` is then updated before the job runs.
+    `gate` is an optional callable(status) -> bool, the job does not start before it
+    returns True, it is polled every second with the status of the finished jobs.
+    """
+
+    def __init__(self, key, deps=(), slots=1, priority=0, payload=None, gate=None, memory=0):
+        self.key = key
+        self.deps = set(deps)
+        self.slots = slots
+        self.memory = memory
+        self.priority = priority
+        self.payload = payload
+        self.gate = gate
+
+    def __repr__(self):
+        return f"<Job {self.key}>"
+
+
+class Scheduler(object):
+
+    def __init__(self, jobs, runner, budget, max_jobs=None, log=print, memory_budget=None):
+        """
+        :param jobs: list of Job
+        :param runner: callable(job) -> bool, executed in a worker thread
+        :param budget: total number of CPU slots shared by the running jobs
+        :param max_jobs: maximum number of jobs running at the same time
+        :param memory_budget: bytes of memory shared by the running jobs, None for no limit
+        """
+        self.jobs = {job.key: job for job in jobs}
+        self.runner = runner
+        self.budget = max(1, budget)
+        self.memory_budget = memory_budget
+        self.max_jobs = max(1, max_jobs or len(self.jobs) or 1)
+        self.log = log
+        unknown = {dep for job in jobs for dep in job.deps} - set(self.jobs)
+        if unknown:
+            raise ValueError(f"Jobs depend on unknown jobs: {', '.join(sorted(unknown))}")
+
+    def _run_job(self, job):
+        try:
+            return bool(self.runner(job))
+        except Exception:
+            self.log(f"[{job.key}] {traceback.format_exc()}")
+            return False
+
+    def _skip_dependents(self, key, status):
+        for job in self.jobs.values():
+            if key in job.deps and job.key not in status:
+                status[job.key] = SKIPPED
+                self.log(f"[{job.key}] skipped, requirement {key} did not build")
+                self._skip_dependents(job.key, status)
+
+    def _ready(self, status, running):
+        ready = [job for job in self.jobs.values()
+                 if job.key not in status and job.key not in running
+                 and all(status.get(dep) == SUCCESS for dep in job.deps)
+                 and (job.gate is None or job.gate(status))]
+        return sorted(ready, key=lambda job: (-job.priority, job.key))
+
+    def _fit_memory(self, job, slots, free_memory, alone):
+        """ Slots of the job fitting into the free memory, 0 if it should wait for running jobs to finish """
+        if self.memory_budget is None or not job.memory:
+            return slots
+        fit = min(slots, int(free_memory // job.memory))
+        if alone:
+            # Nothing will free memory, run with what fits, one slot at least
+            return max(1, fit)
+        # Less than half of its slots would make a heavy build last much longer
+        # than waiting for some memory to be released
+        return fit if fit >= max(1, (slots + 1) // 2) else 0
+
+    def run(self):
+        """ Run every job, returns a dict {key: SUCCESS|FAILED|SKIPPED} """
+        status = {}
+        running = {}  # key -> (future, slots, memory)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_jobs) as executor:
+            while len(status) < len(self.jobs):
+                free = self.budget - sum(slots for _, slots, _ in running.values())
+                free_memory = (self.memory_budget or 0) - sum(memory for _, _, memory in running.values())
+                for job in self._ready(status, running):
+                    if len(running) >= self.max_jobs:
+                        break
+                    # A job larger than the whole budget runs alone with the whole budget
+                    slots = min(job.slots, self.budget)
+                    if slots > free:
+                        continue
+                    slots = self._fit_memory(job, slots, free_memory, alone=not running)
+                    if not slots:
+                        continue
+                    job.slots = slots
+                    free -= slots
+                    free_memory -= slots * job.memory
+                    running[job.key] = (executor.submit(self._run_job, job), slots, slots * job.memory)
+                    if job.memory:
+                        self.log(f"[{job.key}] started ({slots} cpu, {slots * job.memory / (1 << 30):.1f} GiB)")
+                    else:
+                        self.log(f"[{job.key}] started ({slots} cpu)")
+
+                if not running:
+                    break  # Remaining jobs can never become ready
+
+                gated = any(job.gate is not None and job.key not in status and job.key not in running
+                            for job in self.jobs.values())
+                futures = {future: key for key, (future, _, _) in running.items()}
+                done, _ = concurrent.futures.wait(futures, timeout=GATE_POLL_INTERVAL if gated else None,
+                                                  return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    key = futures[future]
+                    del running[key]
+                    if future.result():
+                        status[key] = SUCCESS
+                        self.log(f"[{key}] done")
+                    else:
+                        status[key] = FAILED
+                        self.log(f"[{key}] failed")
+                        self._skip_dependents(key, status)
+        return status
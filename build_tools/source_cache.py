@@ -0,0 +1,263 @@
+"""
+
+Content-addressed cache of the upstream source archives listed in the
+conandata.yml files, keyed by the sha256 they declare.
+
+    # Fill the cache with the archives of every version of every recipe
+    python3 -m build_tools.source_cache prefetch
+
+    # Serve it to the conan hook build_tools/hooks/cci_source_cache.py
+    python3 -m build_tools.source_cache serve --port 8765
+
+    # Check the cached archives against the sha256 of the conandata.yml files
+    python3 -m build_tools.source_cache verify
+
+"""
+
+import argparse
+import concurrent.futures
+import functools
+import hashlib
+import http.server
+import mmap
+import os
+import re
+import shutil
+import tempfile
+import threading
+import urllib.parse
+import urllib.request
+
+from build_tools.layout import REPO_ROOT, RECIPES_DIR, load_yaml
+from build_tools.recipe_index import RecipeIndex
+
+
+DEFAULT_CACHE = os.environ.get("CCI_SOURCE_CACHE", os.path.join(REPO_ROOT, ".cci_build", "sources"))
+HASH_CHUNK = 1 << 24
+SHA256_PATTERN = re.compile(r"[0-9a-f]{64}")
+
+
+class SourceArchive(object):
+    """ One entry of the `sources` of a conandata.yml """
+
+    def __init__(self, name, version, urls, sha256):
+        self.name = name
+        self.version = version
+        self.urls = urls
+        self.sha256 = sha256
+
+    @property
+    def filename(self):
+        """ File name of the archive, `get()` relies on its extension to unpack it """
+        return os.path.basename(urllib.parse.urlparse(self.urls[0]).path)
+
+    def __repr__(self):
+        return f"<SourceArchive {self.name}/{self.version} {self.filename}>"
+
+
+def version_sources(name, version, folder):
+    """ SourceArchive of a recipe version, list-form entries (e.g. opencv and opencv_contrib) give several """
+    conandata = os.path.join(RECIPES_DIR, name, folder, "conandata.yml")
+    return source_archives(name, version, load_yaml(conandata)["sources"][version])
+
+
+def source_archives(name, version, entries):
+    """ SourceArchive of the `sources` entry of a version of conandata.yml """
+    if not isinstance(entries, list):
+        entries = [entries]
+    archives = []
+    for entry in entries:
+        urls = entry["url"] if isinstance(entry["url"], list) else [entry["url"]]
+        archives.append(SourceArchive(name, version, urls, entry.get("sha256")))
+    return archives
+
+
+def all_sources(names=None, log=print):
+    """ SourceArchive of every version listed in the config.yml of the recipes """
+    archives = []
+    for recipe in RecipeIndex.load(names).versions():
+        if recipe.sources is None:
+            log(f"{recipe.ref}: no sources in {recipe.folder.folder}/conandata.yml, skipped")
+            continue
+        archives.extend(source_archives(recipe.name, recipe.version, recipe.sources))
+    return archives
+
+
+def sha256sum(path, chunk=HASH_CHUNK):
+    """ sha256 of a file mapped in memory, hashed `chunk` bytes at a time without copying them. hashlib
+        releases the GIL while hashing large buffers, so threads hash several files in parallel """
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return sha.hexdigest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if hasattr(mapped, "madvise"):
+                mapped.madvise(mmap.MADV_SEQUENTIAL)
+            with memoryview(mapped) as view:
+                for offset in range(0, size, chunk):
+                    sha.update(view[offset:offset + chunk])
+    return sha.hexdigest()
+
+
+class SourceCache(object):
+    """ Archives stored as <root>/<sha256[:2]>/<sha256>/<original file name> """
+
+    def __init__(self, root=DEFAULT_CACHE):
+        self.root = root
+
+    def folder(self, sha256):
+        return os.path.join(self.root, sha256[:2], sha256)
+
+    def lookup(self, sha256):
+        """ Path of the cached archive with this checksum, None if it is not cached """
+        folder = self.folder(sha256)
+        if os.path.isdir(folder):
+            for name in os.listdir(folder):
+                if not name.startswith("."):
+                    return os.path.join(folder, name)
+        return None
+
+    def fetch(self, archive, timeout=60):
+        """ Downloads an archive into the cache unless it is already there, returns its path """
+        if not archive.sha256:
+            raise ValueError(f"{archive.name}/{archive.version}: {archive.filename} has no sha256, it cannot be cached")
+        cached = self.lookup(archive.sha256)
+        if cached:
+            return cached
+
+        folder = self.folder(archive.sha256)
+        os.makedirs(folder, exist_ok=True)
+        errors = []
+        for url in archive.urls:  # Next URLs are mirrors
+            # Hidden temporary file, so that lookup() never returns a partial download
+            fd, tmp = tempfile.mkstemp(prefix=".", dir=folder)
+            try:
+                with os.fdopen(fd, "wb") as f, urllib.request.urlopen(url, timeout=timeout) as response:
+                    shutil.copyfileobj(response, f, 1 << 20)
+                checksum = sha256sum(tmp)
+                if checksum != archive.sha256:
+                    raise IOError(f"sha256 mismatch, got {checksum}")
+                path = os.path.join(folder, archive.filename)
+                os.chmod(tmp, 0o644)
+                os.replace(tmp, path)
+                return path
+            except (IOError, OSError) as error:
+                errors.append(f"{url}: {error}")
+            finally:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+        raise IOError(f"{archive.name}/{archive.version}: cannot download {archive.filename}\n  " + "\n  ".join(errors))
+
+    def prefetch(self, archives, workers=8, log=print):
+        """ Fetches all the archives with a pool of `workers` threads, returns the archives which failed """
+        failed = []
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(self.fetch, archive): archive
+                       for archive in archives if archive.sha256 and not self.lookup(archive.sha256)}
+            for future in concurrent.futures.as_completed(futures):
+                archive = futures[future]
+                try:
+                    log(f"{archive.name}/{archive.version}: {future.result()}")
+                except Exception as error:
+                    log(str(error))
+                    failed.append(archive)
+        return failed
+
+    def verify(self, archives, workers=8, remove=False, log=print):
+        """ Hashes the cached copy of the archives with a pool of `workers` threads, returns the archives
+            (missing, corrupted). Corrupted copies are removed from the cache with `remove` """
+        by_sha256 = {}
+        for archive in archives:
+            if not archive.sha256:
+                log(f"{archive.name}/{archive.version}: {archive.filename} has no sha256, not verified")
+            elif not SHA256_PATTERN.fullmatch(archive.sha256):
+                log(f"{archive.name}/{archive.version}: {archive.filename} has an invalid sha256 {archive.sha256}")
+            else:
+                by_sha256.setdefault(archive.sha256, []).append(archive)
+        missing = []
+        corrupted = []
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {}
+            for sha256, same in by_sha256.items():
+                path = self.lookup(sha256)
+                if path is None:
+                    log(f"{same[0].name}/{same[0].version}: {same[0].urls[0]} is not cached")
+                    missing.extend(same)
+                else:
+                    futures[executor.submit(sha256sum, path)] = (path, same)
+            for future in concurrent.futures.as_completed(futures):
+                path, same = futures[future]
+                try:
+                    checksum = future.result()
+                except (IOError, OSError) as error:
+                    checksum = f"unreadable ({error})"
+                if checksum == same[0].sha256:
+                    continue
+                log(f"{same[0].name}/{same[0].version}: {path} is corrupted, sha256 {checksum} instead of {same[0].sha256}"
+                    + (", removed" if remove else ""))
+                corrupted.extend(same)
+                if remove:
+                    shutil.rmtree(os.path.dirname(path), ignore_errors=True)
+        return missing, corrupted
+
+
+def serve(root, port=0, bind="127.0.0.1"):
+    """ Serves the cache over HTTP from a daemon thread, returns the server (its URL is server.url) """
+    handler = functools.partial(_QuietHandler, directory=root)
+    server = http.server.ThreadingHTTPServer((bind, port), handler)
+    server.url = f"http://{bind}:{server.server_address[1]}"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+class _QuietHandler(http.server.SimpleHTTPRequestHandler):
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the cache of the upstream source archives of the recipes.")
+    parser.add_argument("--cache", default=DEFAULT_CACHE, help="folder of the cache (default: $CCI_SOURCE_CACHE or .cci_build/sources).")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    prefetch = subparsers.add_parser("prefetch", help="download the archives of all the versions listed in config.yml.")
+    prefetch.add_argument("names", nargs="*", help="recipes to prefetch (default: all).")
+    prefetch.add_argument("--jobs", "-j", type=int, default=8, help="parallel downloads.")
+    verify = subparsers.add_parser("verify", help="check the cached archives against the sha256 of conandata.yml.")
+    verify.add_argument("names", nargs="*", help="recipes to verify (default: all).")
+    verify.add_argument("--jobs", "-j", type=int, default=os.cpu_count(), help="archives hashed at the same time.")
+    verify.add_argument("--remove", action="store_true", help="remove the corrupted archives from the cache.")
+    server = subparsers.add_parser("serve", help="serve the cache over HTTP for the conan hook.")
+    server.add_argument("--port", type=int, default=8765)
+    server.add_argument("--bind", default="127.0.0.1")
+    args = parser.parse_args()
+
+    cache = SourceCache(args.cache)
+    if args.command == "prefetch":
+        archives = all_sources(args.names)
+        for archive in archives:
+            if not archive.sha256:
+                print(f"{archive.name}/{archive.version}: {archive.filename} has no sha256, skipped")
+        failed = cache.prefetch(archives, workers=args.jobs)
+        cached = sum(1 for archive in archives if archive.sha256 and cache.lookup(archive.sha256))
+        print(f"{cached} archives cached in {cache.root}, {len(failed)} failed")
+        return 1 if failed else 0
+    if args.command == "verify":
+        archives = all_sources(args.names)
+        missing, corrupted = cache.verify(archives, workers=args.jobs, remove=args.remove)
+        print(f"{len(archives)} archives, {len(missing)} not cached, {len(corrupted)} corrupted")
+        return 1 if missing or corrupted else 0
+
+    server = serve(cache.root, args.port, args.bind)
+    print(f"Serving {cache.root} on {server.url}, export CCI_SOURCE_CACHE_URL={server.url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
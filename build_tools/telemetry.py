@@ -0,0 +1,257 @@
+"""
+
+Resource usage of each `conan create`, kept in a JSON-lines history to spot
+the recipes dominating a build and the regressions between runs
+
+"""
+
+import json
+import os
+import re
+import subprocess
+import threading
+import time
+
+from build_tools.conan_cache import reference_folder
+
+
+POLL_INTERVAL = 1.0
+METRICS = ("wall", "user", "system", "peak_rss", "package_size")
+# Smallest growth worth a report, below it the difference is noise
+MIN_REGRESSION = {"wall": 5.0, "user": 5.0, "system": 5.0, "peak_rss": 16 << 20, "package_size": 1 << 20}
+
+_PACKAGE_CREATED = re.compile(r"Package '([0-9a-f]{40})' created")
+
+
+class Usage(object):
+    """ Resources consumed by a command and all of its descendants """
+
+    def __init__(self):
+        self.returncode = None
+        self.wall = 0.0
+        self.user = 0.0
+        self.system = 0.0
+        self.peak_rss = 0  # bytes, highest sum of the resident memory of the process tree
+
+    def as_dict(self):
+        return {"wall": round(self.wall, 2), "user": round(self.user, 2),
+                "system": round(self.system, 2), "peak_rss": self.peak_rss}
+
+
+def _children():
+    """ {pid: [child pids]} of the processes currently running (Linux only) """
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # The command name may contain spaces, fields after it are space separated
+        ppid = int(stat[stat.rfind(")") + 2:].split()[1])
+        children.setdefault(ppid, []).append(int(entry))
+    return children
+
+
+def tree_rss(pid):
+    """ Resident memory in bytes of a process and its descendants, 0 where /proc is not available """
+    if not os.path.isdir("/proc"):
+        return 0
+    children = _children()
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    total = 0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        pending.extend(children.get(current, []))
+        try:
+            with open(f"/proc/{current}/statm") as f:
+                total += int(f.read().split()[1]) * page_size
+        except OSError:
+            pass
+    return total
+
+
+def _exit_code(status):
+    """ Return code of a wait status, negative signal number when killed like Popen.returncode
+        (os.waitstatus_to_exitcode() needs Python 3.9) """
+    if os.WIFSIGNALED(status):
+        return -os.WTERMSIG(status)
+    return os.WEXITSTATUS(status)
+
+
+def run_measured(command, cwd=None, env=None, stdout=None, poll=None):
+    """ Runs a command to completion, calling `poll()` every second while it runs, and returns its Usage """
+    usage = Usage()
+    start = time.monotonic()
+    process = subprocess.Popen(command, cwd=cwd, env=env, stdout=stdout, stderr=subprocess.STDOUT)
+    if not hasattr(os, "wait4"):
+        # Windows: only the wall time is available
+        while True:
+            try:
+                process.wait(timeout=POLL_INTERVAL)
+                break
+            except subprocess.TimeoutExpired:
+                if poll:
+                    poll()
+        usage.returncode = process.returncode
+        usage.wall = time.monotonic() - start
+        return usage
+
+    # wait4() blocks in a thread, so that the end of the command is seen at once, not at the next sample
+    waited = []
+    exited = threading.Event()
+
+    def reap():
+        waited.append(os.wait4(process.pid, 0))
+        exited.set()
+
+    threading.Thread(target=reap, daemon=True).start()
+    while not exited.wait(POLL_INTERVAL):
+        usage.peak_rss = max(usage.peak_rss, tree_rss(process.pid))
+        if poll:
+            poll()
+    _, status, rusage = waited[0]
+    # Let Popen know the process is gone
+    process.returncode = _exit_code(status)
+    usage.returncode = process.returncode
+    usage.wall = time.monotonic() - start
+    # Times of the descendants are included once they have been waited for by their parents
+    usage.user = rusage.ru_utime
+    usage.system = rusage.ru_stime
+    # ru_maxrss is the peak of the largest single process, in KiB
+    usage.peak_rss = max(usage.peak_rss, rusage.ru_maxrss * 1024)
+    return usage
+
+
+def physical_memory():
+    """ Bytes of RAM of the machine, None where it is not known (Windows) """
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def created_package_id(log_path):
+    with open(log_path, errors="replace") as f:
+        ids = _PACKAGE_CREATED.findall(f.read())
+    return ids[-1] if ids else None
+
+
+def folder_size(folder):
+    total = 0
+    for root, _, files in os.walk(folder):
+        for name in files:
+            path = os.path.join(root, name)
+            if not os.path.islink(path):
+                total += os.path.getsize(path)
+    return total
+
+
+def package_size(package, package_id):
+    if not package_id:
+        return None
+    folder = os.path.join(reference_folder(package), "package", package_id)
+    return folder_size(folder) if os.path.isdir(folder) else None
+
+
+class TelemetryHistory(object):
+    """ One JSON record per `conan create`, appended to `path` """
+
+    def __init__(self, path, run_id=None):
+        self.path = path
+        self.run_id = run_id or time.strftime("%Y%m%dT%H%M%S")
+        self._lock = threading.Lock()
+        self.records = []
+        try:
+            with open(path) as f:
+                self.records = [json.loads(line) for line in f if line.strip()]
+        except IOError:
+            pass
+
+    def record(self, package, profile, usage, package_id=None, size=None, jobs=None):
+        entry = {"run": self.run_id, "ref": package.ref, "name": package.name,
+                 "version": package.version, "profile": profile,
+                 "success": usage.returncode == 0, "jobs": jobs,
+                 "package_id": package_id, "package_size": size}
+        entry.update(usage.as_dict())
+        with self._lock:
+            self.records.append(entry)
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, "a") as f:
+                f.write(json.dumps(entry, sort_keys=True) + "\n")
+        return entry
+
+    def current_run(self):
+        return [r for r in self.records if r["run"] == self.run_id]
+
+    def previous(self, ref, profile):
+        """ Last successful record of a package built by an earlier run """
+        for entry in reversed(self.records):
+            if entry["run"] != self.run_id and entry["ref"] == ref \
+               and entry["profile"] == profile and entry["success"]:
+                return entry
+        return None
+
+    def estimate(self, ref, profile):
+        """ Last successful record of a package, for another profile if it was never built for this one """
+        same = self.previous(ref, profile)
+        if same:
+            return same
+        for entry in reversed(self.records):
+            if entry["run"] != self.run_id and entry["ref"] == ref and entry["success"]:
+                return entry
+        return None
+
+    def memory_per_job(self, ref, profile, samples=5):
+        """ Highest peak RSS per build job of the last `samples` successful builds of a package,
+            preferably for the same profile, None if it was never built """
+        for same_profile in (True, False):
+            peaks = [entry["peak_rss"] / entry["jobs"] for entry in reversed(self.records)
+                     if entry["ref"] == ref and entry["success"] and entry.get("jobs") and entry.get("peak_rss")
+                     and (entry["profile"] == profile or not same_profile)][:samples]
+            if peaks:
+                return int(max(peaks))
+        return None
+
+    def regressions(self, threshold):
+        """ (record, metric, previous value) of the metrics which grew by more than `threshold` percent
+            since the last successful build of the same package and profile """
+        result = []
+        for entry in self.current_run():
+            before = self.previous(entry["ref"], entry["profile"]) if entry["success"] else None
+            if not before:
+                continue
+            for metric in METRICS:
+                old, new = before.get(metric), entry.get(metric)
+                if old and new and new - old >= MIN_REGRESSION[metric] and (new - old) * 100.0 / old > threshold:
+                    result.append((entry, metric, old))
+        return result
+
+
+def _human(metric, value):
+    if value is None:
+        return "-"
+    if metric in ("peak_rss", "package_size"):
+        return f"{value / (1 << 20):.0f} MiB"
+    return f"{value:.0f} s"
+
+
+def report(history, threshold, log=print):
+    """ Prints the usage of the builds of the current run and the regressions against the previous ones """
+    entries = sorted(history.current_run(), key=lambda r: r["wall"], reverse=True)
+    if not entries:
+        return []
+    log(f"{'package':<32} {'profile':<24} " + " ".join(f"{m:>12}" for m in METRICS))
+    for entry in entries:
+        status = "" if entry["success"] else " (failed)"
+        log(f"{entry['ref']:<32} {entry['profile']:<24} "
+            + " ".join(f"{_human(m, entry.get(m)):>12}" for m in METRICS) + status)
+
+    regressions = history.regressions(threshold)
+    for entry, metric, old in regressions:
+        log(f"Regression: {entry['ref']} ({entry['profile']}) {metric} "
+            f"{_human(metric, old)} -> {_human(metric, entry[metric])}")
+    return regressions
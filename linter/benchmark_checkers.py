@@ -0,0 +1,106 @@
+"""
+
+Time spent per recipe by the CCI checkers, separate (one checker per rule group,
+as registered before) versus fused (linter/check_conanfile_rules.py).
+
+    PYTHONPATH=. python3 linter/benchmark_checkers.py [recipes] [--repeat 50]
+
+The conanfiles are parsed once, then pylint walks each of them with every set of
+checkers in turn, the best time of the repeated walks is kept. The walk of a tree
+without any checker is measured too, it is the part of the time that no checker
+can reduce. The messages of both sets are compared to make sure they are the same.
+
+"""
+
+import argparse
+import glob
+import os
+import statistics
+import time
+
+import astroid
+from pylint.lint import PyLinter
+from pylint.reporters import CollectingReporter
+from pylint.utils import ASTWalker
+
+from linter.check_conanfile_rules import ConanFileRules, TestConanFileRules
+from linter.check_import_conanfile import ImportConanFile
+from linter.check_import_errors import ImportErrorsConanException, ImportErrorsConanInvalidConfiguration, ImportErrors
+from linter.check_import_tools import ImportTools
+from linter.check_no_test_package_name import NoPackageName
+from linter.check_package_name import PackageName
+
+
+SEPARATE = [ImportConanFile, ImportErrors, ImportErrorsConanException, ImportErrorsConanInvalidConfiguration, ImportTools]
+CHECKERS = {
+    "none": {"recipe": [], "test": []},
+    "separate": {"recipe": [PackageName] + SEPARATE, "test": [NoPackageName] + SEPARATE},
+    "fused": {"recipe": [ConanFileRules], "test": [TestConanFileRules]},
+}
+
+
+def is_test_package(path):
+    return os.path.basename(os.path.dirname(path)).startswith("test_")
+
+
+def _walker(checker_classes):
+    linter = PyLinter(reporter=CollectingReporter())
+    walker = ASTWalker(linter)
+    for checker_class in checker_classes:
+        checker = checker_class(linter)
+        linter.register_checker(checker)
+        walker.add_checker(checker)
+    return linter, walker
+
+
+def benchmark(checker_sets, modules, repeat):
+    """ {set name: [best walk time of each module]} and {set name: messages}, the sets
+        are interleaved so that they run under the same conditions """
+    walkers = {name: _walker(classes) for name, classes in checker_sets.items()}
+    timings = {name: [] for name in checker_sets}
+    messages = {name: [] for name in checker_sets}
+    for path, module in modules:
+        best = dict.fromkeys(checker_sets, float("inf"))
+        for _ in range(repeat):
+            for name, (linter, walker) in walkers.items():
+                linter.set_current_module(module.name, path)
+                del linter.reporter.messages[:]
+                start = time.perf_counter()
+                walker.walk(module)
+                best[name] = min(best[name], time.perf_counter() - start)
+        for name, (linter, _) in walkers.items():
+            timings[name].append(best[name])
+            messages[name].extend((path, m.line, m.msg_id) for m in linter.reporter.messages)
+    return timings, messages
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the lint time per recipe of the separate and fused CCI checkers.")
+    parser.add_argument("recipes", nargs="?", default=os.path.join(os.path.dirname(__file__), "..", "recipes"))
+    parser.add_argument("--repeat", type=int, default=50, help="walks of each file, the best time is kept.")
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(args.recipes, "*", "*", "conanfile.py")) +
+                   glob.glob(os.path.join(args.recipes, "*", "*", "test_*", "conanfile.py")))
+    start = time.perf_counter()
+    modules = {"recipe": [], "test": []}
+    for path in paths:
+        kind = "test" if is_test_package(path) else "recipe"
+        modules[kind].append((path, astroid.MANAGER.ast_from_file(path, "conanfile", source=True)))
+    print(f"Parsed {len(paths)} conanfiles in {time.perf_counter() - start:.2f} s")
+
+    print(f"{'files':<8} {'checkers':<10} {'count':>6} {'mean':>10} {'median':>10} {'total':>10} {'checkers only':>14}")
+    for kind, kind_modules in modules.items():
+        timings, messages = benchmark({name: sets[kind] for name, sets in CHECKERS.items()}, kind_modules, args.repeat)
+        for name, values in timings.items():
+            checkers_only = sum(values) - sum(timings["none"])
+            print(f"{kind:<8} {name:<10} {len(values):>6} {statistics.mean(values) * 1e6:>8.0f}us "
+                  f"{statistics.median(values) * 1e6:>8.0f}us {sum(values) * 1e3:>8.2f}ms {checkers_only * 1e3:>12.2f}ms")
+        if messages["separate"] != messages["fused"]:
+            print(f"Different messages for the {kind} files: {messages['separate']} != {messages['fused']}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
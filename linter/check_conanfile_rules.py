@@ -0,0 +1,120 @@
+import re
+from pylint.checkers import BaseChecker
+from pylint.interfaces import IAstroidChecker
+from astroid import nodes, Const, AssignName
+
+
+# Messages of the rules, shared with the checkers they replace
+MESSAGES = {
+    "E9004": (
+        "Reference name should be all lowercase",
+        "conan-bad-name",
+        "Use only lower-case on the package name: `name = 'foobar'`."
+    ),
+    "E9005": (
+        "Missing name attribute",
+        "conan-missing-name",
+        "The member attribute `name` must be declared: `name = 'foobar'`."
+    ),
+    "E9006": (
+        "Import ConanFile from new module: `from conan import ConanFile`. Old import is deprecated in Conan v2.",
+        "conan-import-conanfile",
+        "Import ConanFile from new module: `from conan import ConanFile`. Old import is deprecated in Conan v2.",
+    ),
+    "E9007": (
+        "No 'name' attribute in test_package conanfile",
+        "conan-test-no-name",
+        "No 'name' attribute in test_package conanfile."
+    ),
+    "E9008": (
+        "Import errors from new module: `from conan import errors`. Old import is deprecated in Conan v2.",
+        "conan-import-errors",
+        "Import errors from new module: `from conan import errors`. Old import is deprecated in Conan v2.",
+    ),
+    "E9009": (
+        "Import ConanException from new module: `from conan.errors import ConanException`. Old import is deprecated in Conan v2.",
+        "conan-import-error-conanexception",
+        "Import ConanException from new module: `from conan.errors import ConanException`. Old import is deprecated in Conan v2.",
+    ),
+    "E9010": (
+        "Import ConanInvalidConfiguration from new module: `from conan.errors import ConanInvalidConfiguration`. Old import is deprecated in Conan v2.",
+        "conan-import-error-conaninvalidconfiguration",
+        "Import ConanInvalidConfiguration from new module: `from conan.errors import ConanInvalidConfiguration`. Old import is deprecated in Conan v2.",
+    ),
+    "E9011": (
+        "Import tools following pattern 'from conan.tools.xxxx import yyyyy' (https://docs.conan.io/en/latest/reference/conanfile/tools.html).",
+        "conan-import-tools",
+        "Import tools following pattern 'from conan.tools.xxxx import yyyyy' (https://docs.conan.io/en/latest/reference/conanfile/tools.html).",
+    ),
+}
+
+# Dispatch table of the imports: module -> {imported name: message id}
+IMPORT_RULES = {
+    "conans": {"ConanFile": "E9006", "errors": "E9008"},
+    "conans.errors": {"ConanException": "E9009", "ConanInvalidConfiguration": "E9010"},
+    "conan": {"tools": "E9011"},
+}
+# Modules below conan.tools.xxx are private
+PRIVATE_TOOLS = re.compile(r'conan\.tools\.[^.]+\..+')
+
+
+def _name_attributes(node):
+    """ Class attributes assigning a constant to `name` """
+    for attr in node.body:
+        # Methods are most of the body, do not list their children
+        if not isinstance(attr, (nodes.Assign, nodes.AugAssign, nodes.AnnAssign)):
+            continue
+        children = list(attr.get_children())
+        if len(children) == 2 and \
+           isinstance(children[0], AssignName) and \
+           children[0].name == "name" and \
+           isinstance(children[1], Const):
+            yield attr
+
+
+class ConanFileRules(BaseChecker):
+    """
+       All the rules E9004-E9011 of a recipe, evaluated in a single visit of each import and ConanFile class
+    """
+
+    __implements__ = IAstroidChecker
+
+    name = "conan-conanfile-rules"
+    msgs = {msgid: MESSAGES[msgid] for msgid in ("E9004", "E9005", "E9006", "E9008", "E9009", "E9010", "E9011")}
+
+    def visit_importfrom(self, node: nodes.ImportFrom) -> None:
+        rules = IMPORT_RULES.get(node.modname)
+        if rules:
+            names = {name for name, _ in node.names}
+            # Rules are sorted by message id, like the messages of the separate checkers
+            for name, msgid in rules.items():
+                if name in names:
+                    self.add_message(MESSAGES[msgid][1], node=node)
+        elif PRIVATE_TOOLS.match(node.modname):
+            self.add_message("conan-import-tools", node=node)
+
+    def visit_classdef(self, node: nodes) -> None:
+        if node.basenames == ['ConanFile']:
+            self._check_name(node, list(_name_attributes(node)))
+
+    def _check_name(self, node, attributes):
+        if not attributes:
+            self.add_message("conan-missing-name", node=node)
+            return
+        attr = attributes[0]
+        value = attr.value.as_string()
+        if value.lower() != value:
+            self.add_message("conan-bad-name", node=attr, line=attr.lineno)
+
+
+class TestConanFileRules(ConanFileRules):
+    """
+       Rules of a test_package conanfile: E9007 instead of E9004 and E9005
+    """
+
+    name = "conan-test-conanfile-rules"
+    msgs = {msgid: MESSAGES[msgid] for msgid in ("E9006", "E9007", "E9008", "E9009", "E9010", "E9011")}
+
+    def _check_name(self, node, attributes):
+        for attr in attributes:
+            self.add_message("conan-test-no-name", node=attr, line=attr.lineno)
@@ -0,0 +1,162 @@
+from pylint.checkers import BaseChecker
+from pylint.interfaces import IAstroidChecker
+from astroid import nodes
+
+
+MESSAGES = {
+    "W9012": (
+        "%s runs a subprocess (%s) each time the graph is resolved",
+        "conan-subprocess-in-requirements",
+        "The requirements are evaluated for every node of every graph, a subprocess there slows down each "
+        "`conan install`. Declare the tool requirement unconditionally, or decide from settings and options.",
+    ),
+    "W9013": (
+        "%s scans the package folder at each iteration of a loop",
+        "conan-collect-libs-in-loop",
+        "collect_libs() lists the libraries of the package folder, call it once before the loop and filter "
+        "its result inside.",
+    ),
+    "W9014": (
+        "Property %s builds %d statements of data at each access, from %d places",
+        "conan-expensive-property",
+        "The property runs again each time it is read. Compute the data once in a method and pass it, "
+        "or cache it in an attribute of the recipe.",
+    ),
+    "W9015": (
+        "source() downloads %s whatever the options",
+        "conan-unconditional-downloads",
+        "Download the archives only some options need (contrib modules, extra data...) when these options "
+        "are enabled, so that the other configurations do not fetch them.",
+    ),
+}
+
+# Methods run while resolving the graph, for every consumer
+REQUIREMENTS_METHODS = ("requirements", "build_requirements")
+SUBPROCESS_CALLS = {"self.run", "os.system", "os.popen", "subprocess.run", "subprocess.call", "subprocess.check_call",
+                    "subprocess.check_output", "subprocess.Popen", "check_output", "Popen"}
+COLLECT_LIBS_CALLS = {"collect_libs", "tools.collect_libs"}
+# Downloads which extract an archive, download() of a license file is cheap
+ARCHIVE_CALLS = {"get", "tools.get", "files.get"}
+LOOPS = (nodes.For, nodes.While, nodes.Comprehension, nodes.ListComp, nodes.SetComp, nodes.DictComp, nodes.GeneratorExp)
+SCOPES = (nodes.FunctionDef, nodes.Lambda)
+
+
+def _calls(node, names):
+    """ Calls below `node` of a function written as one of `names` """
+    for call in node.nodes_of_class(nodes.Call):
+        if call.func.as_string() in names:
+            yield call
+
+
+def _self_members(node):
+    """ (name, node) of the self.xxx attributes read below `node` """
+    for attribute in node.nodes_of_class(nodes.Attribute):
+        if isinstance(attribute.expr, nodes.Name) and attribute.expr.name == "self":
+            yield attribute.attrname, attribute
+
+
+def _in_loop(node):
+    """ Whether a loop of the function of `node` runs it at each iteration """
+    child, parent = node, node.parent
+    while parent is not None and not isinstance(parent, SCOPES):
+        if isinstance(parent, nodes.Comprehension) and child is parent.iter and parent is parent.parent.generators[0]:
+            # The iterable of the first `for` of a comprehension is evaluated once
+            child, parent = parent.parent, parent.parent.parent
+            continue
+        if isinstance(parent, LOOPS) and not (isinstance(parent, nodes.For) and child is parent.iter):
+            return True
+        child, parent = parent, parent.parent
+    return False
+
+
+def _is_conditional(node, function):
+    """ Whether an if, or a try, of `function` contains `node` """
+    parent = node.parent
+    while parent is not None and parent is not function:
+        if isinstance(parent, (nodes.If, nodes.IfExp, nodes.TryExcept)):
+            return True
+        parent = parent.parent
+    return False
+
+
+def _is_property(method):
+    return any(decorator.as_string() == "property" for decorator in (method.decorators.nodes if method.decorators else []))
+
+
+class PerformanceRules(BaseChecker):
+    """
+       Patterns of a recipe which slow down the graph resolution or the builds, W9012-W9015
+    """
+
+    __implements__ = IAstroidChecker
+
+    name = "conan-performance-rules"
+    msgs = MESSAGES
+    options = (
+        (
+            "max-property-statements",
+            {
+                "default": 30,
+                "type": "int",
+                "metavar": "<int>",
+                "help": "Statements of a property read from several places above which it is reported by W9014.",
+            },
+        ),
+    )
+
+    def visit_classdef(self, node: nodes) -> None:
+        if node.basenames != ['ConanFile']:
+            return
+        methods = {member.name: member for member in node.mymethods()}
+        for name in REQUIREMENTS_METHODS:
+            if name in methods:
+                self._check_subprocesses(methods[name], methods)
+        for method in methods.values():
+            for call in _calls(method, COLLECT_LIBS_CALLS):
+                if _in_loop(call):
+                    self.add_message("conan-collect-libs-in-loop", node=call, args=(call.func.as_string(),))
+        self._check_properties(node, methods)
+        if "source" in methods:
+            self._check_downloads(methods["source"])
+
+    def _check_subprocesses(self, method, methods):
+        """ Subprocesses of a requirements method, or of the methods and properties of the recipe it uses """
+        for call in _calls(method, SUBPROCESS_CALLS):
+            self.add_message("conan-subprocess-in-requirements", node=call, args=(method.name, call.func.as_string()))
+        for name, attribute in _self_members(method):
+            helper = self._subprocess_of(methods.get(name), methods, {method.name})
+            if helper:
+                self.add_message("conan-subprocess-in-requirements", node=attribute,
+                                 args=(method.name, f"{helper} through self.{name}"))
+
+    def _subprocess_of(self, method, methods, seen):
+        """ The first subprocess call of a method of the recipe, following the methods it uses """
+        if method is None or method.name in seen:
+            return None
+        seen.add(method.name)
+        for call in _calls(method, SUBPROCESS_CALLS):
+            return call.func.as_string()
+        for name, _ in _self_members(method):
+            found = self._subprocess_of(methods.get(name), methods, seen)
+            if found:
+                return found
+        return None
+
+    def _check_properties(self, node, methods):
+        properties = {name: method for name, method in methods.items() if _is_property(method)}
+        uses = {}
+        for name, attribute in _self_members(node):
+            if name in properties:
+                uses.setdefault(name, []).append(attribute)
+        for name, attributes in uses.items():
+            places = len(attributes) + sum(1 for attribute in attributes if _in_loop(attribute))
+            statements = sum(1 for _ in properties[name].nodes_of_class(nodes.Statement)) - 1
+            if places > 1 and statements > self.config.max_property_statements:
+                self.add_message("conan-expensive-property", node=properties[name], args=(name, statements, places))
+
+    def _check_downloads(self, method):
+        downloads = [call for call in _calls(method, ARCHIVE_CALLS) if not _is_conditional(call, method)]
+        # A loop downloads every archive of a list
+        if len(downloads) > 1 or any(_in_loop(call) for call in downloads):
+            what = f"{len(downloads)} archives" if len(downloads) > 1 else "every archive of a list"
+            self.add_message("conan-unconditional-downloads", node=downloads[0], args=(what,))
@@ -0,0 +1,12 @@
+"""
+
+Pylint plugin/rules on the performance of the conanfiles in Conan Center Index
+
+"""
+
+from pylint.lint import PyLinter
+from linter.check_performance_rules import PerformanceRules
+
+
+def register(linter: PyLinter) -> None:
+    linter.register_checker(PerformanceRules(linter))
@@ -0,0 +1,145 @@
+"""
+
+Stubs of the conans classes that transform_conanfile injects in ConanFile. Without them,
+astroid builds the conans modules of these classes, and the modules they import, at the
+start of every pylint run. Write the stubs once per version of conan with:
+
+    python3 linter/conan_stubs.py build
+
+and compare the time to lint a test_package with and without them:
+
+    python3 linter/conan_stubs.py measure recipes/fmt/all/test_package/conanfile.py
+
+The stubs are written in .cci_build/lint_stubs, or in the folder set by the environment
+variable CCI_LINT_STUBS (set it empty to disable them).
+
+"""
+
+import argparse
+import hashlib
+import importlib.util
+import os
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Module -> class of the dynamic fields of ConanFile
+STUBBED_CLASSES = {
+    "conans.model.info": "ConanInfo",
+    "conans.client.graph.graph_manager": "_RecipeBuildRequires",
+    "conans.client.file_copier": "FileCopier",
+    "conans.client.importer": "_FileImporter",
+    "conans.client.graph.python_requires": "PyRequires",
+}
+
+
+def stubs_folder():
+    return os.environ.get("CCI_LINT_STUBS", os.path.join(REPO_ROOT, ".cci_build", "lint_stubs"))
+
+
+def _module_file(modname):
+    """ Source file of a module of conans, found without importing conans """
+    spec = importlib.util.find_spec(modname.split(".")[0])
+    if spec is None or not spec.submodule_search_locations:
+        return None
+    path = os.path.join(spec.submodule_search_locations[0], *modname.split(".")[1:])
+    return path + ".py" if os.path.isfile(path + ".py") else os.path.join(path, "__init__.py")
+
+
+def stub_path(modname):
+    """ Stub file of a module, named by the hash of the module and of this generator, None if conans is missing """
+    module_file = _module_file(modname)
+    if not stubs_folder() or module_file is None or not os.path.isfile(module_file):
+        return None
+    sha = hashlib.sha256()
+    for path in (module_file, __file__):
+        with open(path, "rb") as f:
+            sha.update(f.read())
+    return os.path.join(stubs_folder(), f"{modname}-{sha.hexdigest()[:16]}.py")
+
+
+def stub_source(class_node):
+    """ Source of a class with the members of `class_node`: its bases from outside conans, the signatures
+        of its methods and its attributes, without any body """
+    lines = []
+    bases = []
+    for base in class_node.bases:
+        inferred = next(base.infer(), None)
+        qname = getattr(inferred, "qname", lambda: "")()
+        module, _, name = qname.rpartition(".")
+        if module and module != "builtins" and not module.startswith("conans"):
+            lines.append(f"from {module} import {name}")
+            bases.append(name)
+    lines += ["", "", f"class {class_node.name}({', '.join(bases) or 'object'}):"]
+    for name, members in class_node.locals.items():
+        member = members[-1]
+        if name in ("__module__", "__qualname__"):
+            continue
+        if member.is_function:
+            for decorator in member.decorators.nodes if member.decorators else []:
+                lines.append(f"    @{decorator.as_string()}")
+            lines.append(f"    def {name}({member.args.as_string()}):")
+            attributes = class_node.instance_attrs if name == "__init__" else []
+            lines += [f"        self.{attribute} = None" for attribute in attributes] or ["        pass"]
+        else:
+            # Aliases of methods (clear = header_only) keep their target
+            value = member.parent.value if hasattr(member.parent, "value") else None
+            is_alias = value is not None and value.as_string() in class_node.locals
+            lines.append(f"    {name} = {value.as_string() if is_alias else 'None'}")
+    return "\n".join(lines) + "\n"
+
+
+def build_stubs():
+    """ Writes the stub of each stubbed module, returns their paths """
+    import astroid
+
+    paths = []
+    for modname, classname in STUBBED_CLASSES.items():
+        path = stub_path(modname)
+        if path is None:
+            continue
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(f"{path}.tmp", "w") as f:
+            f.write(stub_source(astroid.MANAGER.ast_from_module_name(modname)[classname]))
+        os.replace(f"{path}.tmp", path)
+        paths.append(path)
+    return paths
+
+
+def measure(conanfile, repeat):
+    """ Best wall time of pylint over a test_package with and without the stubs """
+    rcfile = os.path.join(REPO_ROOT, "linter", "pylintrc_testpackage")
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT)
+    for label, folder in (("without stubs", ""), ("with stubs", stubs_folder())):
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, "-m", "pylint", "--rcfile", rcfile, conanfile],
+                           env=dict(env, CCI_LINT_STUBS=folder), stdout=subprocess.DEVNULL)
+            best = min(best, time.perf_counter() - start)
+        print(f"{label:<14} {best:.2f} s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stubs of the conans classes used by the ConanFile transform of the linter.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("build", help="write the stubs of the installed conan.")
+    timing = subparsers.add_parser("measure", help="time pylint over a conanfile with and without the stubs.")
+    timing.add_argument("conanfile")
+    timing.add_argument("--repeat", type=int, default=5, help="runs of each case, the best time is kept.")
+    args = parser.parse_args()
+
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+    paths = build_stubs()
+    if args.command == "build":
+        for path in paths:
+            print(path)
+        return 0 if paths else 1
+    measure(args.conanfile, args.repeat)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
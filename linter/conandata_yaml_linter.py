@@ -1,4 +1,6 @@
 import argparse
+import functools
+import os
 from strictyaml import (
     load,
     Map,
@@ -10,46 +12,74 @@ from strictyaml import (
     Enum,
     Any,
 )
-from yaml_linting import file_path
+from yaml_linting import block_yaml, file_or_directory_path, validate_files, yaml_files
 
+PATCH_TYPES = ["official", "conan", "portability", "bugfix", "vulnerability"]
+# Patches of these types should tell where they come from
+SOURCED_PATCH_TYPES = ["official", "bugfix", "vulnerability"]
+REQUIRED_PATCH_FIELDS = {"patch_file", "patch_description", "patch_type"}
+PATCH_FIELDS = REQUIRED_PATCH_FIELDS | {"patch_source", "sha256", "base_path"}
 
-def main():
-    parser = argparse.ArgumentParser(
-        description="Validate Conan's 'conandata.yaml' file to ConanCenterIndex's requirements."
-    )
-    parser.add_argument(
-        "path",
-        nargs="?",
-        type=file_path,
-        help="file to validate.",
-    )
-    args = parser.parse_args()
 
+@functools.lru_cache(maxsize=None)
+def schema():
     patch_fields = Map(
         {
             "patch_file": Str(),
             "patch_description": Str(),
-            "patch_type": Enum(
-                ["official", "conan", "portability", "bugfix", "vulnerability"]
-            ),
+            "patch_type": Enum(PATCH_TYPES),
             Optional("patch_source"): Str(),
             Optional("sha256"): Str(),  # Really uncommon
             # No longer required for v2 recipes with layouts
             Optional("base_path"): Str(),
         }
     )
-    schema = Map(
+    return Map(
         {
             "sources": MapPattern(Str(), Any(), minimum_keys=1),
             Optional("patches"): MapPattern(Str(), Seq(patch_fields), minimum_keys=1),
         }
     )
 
-    with open(args.path) as f:
+
+def _is_valid_patch(patch):
+    return (
+        isinstance(patch, dict)
+        and REQUIRED_PATCH_FIELDS <= set(patch) <= PATCH_FIELDS
+        and all(isinstance(value, str) for value in patch.values())
+        and patch["patch_type"] in PATCH_TYPES
+        and (patch["patch_type"] not in SOURCED_PATCH_TYPES or "patch_source" in patch)
+    )
+
+
+def is_clean(content):
+    """True if the fast parse of the content shows that it passes the schema without any warning.
+    Otherwise strictyaml must validate it: it finds the lines of the errors and warnings"""
+    data = block_yaml(content)
+    if not isinstance(data, dict) or not {"sources"} <= set(data) <= {"sources", "patches"}:
+        return False
+    if not isinstance(data["sources"], dict) or not data["sources"]:
+        return False
+    patches = data.get("patches", {"": []})
+    return (
+        isinstance(patches, dict)
+        and len(patches) > 0
+        and all(isinstance(version, list) and all(_is_valid_patch(patch) for patch in version)
+                for version in patches.values())
+    )
+
+
+def validate(path):
+    """Annotations of a conandata.yml file"""
+    annotations = []
+    with open(path) as f:
         content = f.read()
 
+    if is_clean(content):
+        return annotations
+
     try:
-        parsed = load(content, schema)
+        parsed = load(content, schema())
 
         if "patches" in parsed:
             for version in parsed["patches"]:
@@ -57,25 +87,50 @@ def main():
                 for i, patch in enumerate(patches):
                     type = parsed["patches"][version][i]["patch_type"]
                     if (
-                        type in ["official", "bugfix", "vulnerability"]
+                        type in SOURCED_PATCH_TYPES
                         and not "patch_source" in patch
                     ):
-                        print(
-                            f"::warning file={args.path},line={type.start_line},endline={type.end_line},"
+                        annotations.append(
+                            f"::warning file={path},line={type.start_line},endline={type.end_line},"
                             f"title=conandata.yml schema warning"
                             "::'patch_type' should have 'patch_source' as per https://github.com/conan-io/conan-center-index/blob/master/docs/conandata_yml_format.md#patches-fields"
                             " it is expected to have a source (e.g. a URL) to where it originates from to help with reviewing and consumers to evaluate patches\n"
                         )
     except YAMLValidationError as error:
         e = error.__str__().replace("\n", "%0A")
-        print(
-            f"::error file={args.path},line={error.context_mark.line},endline={error.problem_mark.line},"
+        annotations.append(
+            f"::error file={path},line={error.context_mark.line},endline={error.problem_mark.line},"
             f"title=conandata.yml schema error"
             f"::{e}\n"
         )
     except BaseException as error:
         e = error.__str__().replace("\n", "%0A")
-        print(f"::error ::{e}")
+        annotations.append(f"::error ::{e}")
+    return annotations
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Validate Conan's 'conandata.yaml' file to ConanCenterIndex's requirements."
+    )
+    parser.add_argument(
+        "paths",
+        nargs="+",
+        type=file_or_directory_path,
+        help="files to validate, or directories to search for conandata.yml files.",
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=os.cpu_count(),
+        help="files validated concurrently.",
+    )
+    args = parser.parse_args()
+
+    for annotations in validate_files(validate, yaml_files(args.paths, "conandata.yml"), args.jobs):
+        for annotation in annotations:
+            print(annotation)
 
 
 if __name__ == "__main__":
@@ -1,36 +1,56 @@
 import argparse
+import functools
+import os
 from strictyaml import load, Map, Str, YAMLValidationError, MapPattern
-from yaml_linting import file_path
+from yaml_linting import file_or_directory_path, validate_files, yaml_files
 
 
-def main():
-    parser = argparse.ArgumentParser(
-        description="Validate ConanCenterIndex's 'config.yaml' file."
-    )
-    parser.add_argument(
-        "path",
-        nargs="?",
-        type=file_path,
-        help="file to validate.",
-    )
-    args = parser.parse_args()
-
-    schema = Map(
+@functools.lru_cache(maxsize=None)
+def schema():
+    return Map(
         {"versions": MapPattern(Str(), Map({"folder": Str()}), minimum_keys=1)}
     )
 
-    with open(args.path) as f:
+
+def validate(path):
+    """Annotations of a config.yml file"""
+    with open(path) as f:
         content = f.read()
 
     try:
-        load(content, schema)
+        load(content, schema())
     except YAMLValidationError as error:
         e = error.__str__().replace("\n", "%0A")
-        print(
-            f"::error file={args.path},line={error.context_mark.line},endline={error.problem_mark.line},"
+        return [
+            f"::error file={path},line={error.context_mark.line},endline={error.problem_mark.line},"
             f"title=config.yml schema error"
             f"::{e}\n"
-        )
+        ]
+    return []
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Validate ConanCenterIndex's 'config.yaml' file."
+    )
+    parser.add_argument(
+        "paths",
+        nargs="+",
+        type=file_or_directory_path,
+        help="files to validate, or directories to search for config.yml files.",
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=os.cpu_count(),
+        help="files validated concurrently.",
+    )
+    args = parser.parse_args()
+
+    for annotations in validate_files(validate, yaml_files(args.paths, "config.yml"), args.jobs):
+        for annotation in annotations:
+            print(annotation)
 
 
 if __name__ == "__main__":
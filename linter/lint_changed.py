@@ -0,0 +1,103 @@
+"""
+
+Lint only the recipes changed since a base ref: the conanfiles with pylint (lint_recipes.py),
+the config.yml and conandata.yml files with their schema linters. A change to the linters
+themselves lints every recipe.
+
+    python3 linter/lint_changed.py origin/master
+
+"""
+
+import argparse
+import glob
+import os
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LINTER_DIR = os.path.join(REPO_ROOT, "linter")
+RECIPES_DIR = os.path.join(REPO_ROOT, "recipes")
+
+
+def _git(args):
+    return subprocess.run(["git"] + args, cwd=REPO_ROOT, check=True, capture_output=True, text=True).stdout.split("\n")
+
+
+def changed_paths(base):
+    """ Paths relative to the root of the repository changed since the merge base of `base` and HEAD,
+        including the uncommitted and the untracked files """
+    merge_base = _git(["merge-base", base, "HEAD"])[0]
+    paths = _git(["diff", "--name-only", merge_base]) + _git(["ls-files", "--others", "--exclude-standard"])
+    return sorted(set(path for path in paths if path))
+
+
+def affected_recipes(paths):
+    """ Folders recipes/<name> of the changed paths, None if a shared linter file changed and every recipe must be linted """
+    recipes = set()
+    for path in paths:
+        parts = path.split("/")
+        if parts[0] == "linter":
+            return None
+        if parts[0] == "recipes" and len(parts) > 2 and os.path.isdir(os.path.join(RECIPES_DIR, parts[1])):
+            recipes.add(os.path.join(RECIPES_DIR, parts[1]))
+    return sorted(recipes)
+
+
+def yaml_files(recipes):
+    """ (linter script, file) of the config.yml and conandata.yml of the recipes """
+    files = []
+    for recipe in recipes:
+        if os.path.isfile(os.path.join(recipe, "config.yml")):
+            files.append(("config_yaml_linter.py", os.path.join(recipe, "config.yml")))
+        for conandata in sorted(glob.glob(os.path.join(recipe, "*", "conandata.yml"))):
+            files.append(("conandata_yaml_linter.py", conandata))
+    return files
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Lint the recipes of ConanCenterIndex changed since a base ref."
+    )
+    parser.add_argument("base", nargs="?", default="origin/master", help="ref to compare to (default: origin/master).")
+    parser.add_argument("--jobs", "-j", type=int, default=os.cpu_count(), help="pylint processes.")
+    parser.add_argument("--list", action="store_true", help="print the files to lint and exit.")
+    args = parser.parse_args()
+
+    try:
+        paths = changed_paths(args.base)
+    except subprocess.CalledProcessError as error:
+        print(f"Cannot compare to {args.base}: {error.stderr.strip()}", file=sys.stderr)
+        return 2
+    recipes = affected_recipes(paths)
+    if recipes is None:
+        print("The linters changed, linting every recipe", file=sys.stderr)
+        recipes = sorted(os.path.join(RECIPES_DIR, name) for name in os.listdir(RECIPES_DIR)
+                         if os.path.isdir(os.path.join(RECIPES_DIR, name)))
+    if not recipes:
+        print(f"No recipe changed since {args.base}", file=sys.stderr)
+        return 0
+
+    yaml = yaml_files(recipes)
+    if args.list:
+        conanfiles = glob.glob(os.path.join(RECIPES_DIR, "*", "*", "**", "conanfile.py"), recursive=True)
+        for path in sorted(path for path in conanfiles if any(path.startswith(recipe + os.sep) for recipe in recipes)):
+            print(os.path.relpath(path))
+        for _, path in yaml:
+            print(os.path.relpath(path))
+        return 0
+
+    failed = subprocess.run([sys.executable, os.path.join(LINTER_DIR, "lint_recipes.py"), "--jobs", str(args.jobs)]
+                            + recipes).returncode != 0
+    for script in ("config_yaml_linter.py", "conandata_yaml_linter.py"):
+        paths = [os.path.relpath(path) for linter, path in yaml if linter == script]
+        if not paths:
+            continue  # The linters require at least one file
+        output = subprocess.run([sys.executable, os.path.join(LINTER_DIR, script), "--jobs", str(args.jobs)] + paths,
+                                capture_output=True, text=True).stdout
+        sys.stdout.write(output)
+        failed |= "::error" in output
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,270 @@
+"""
+
+Lint server keeping pylint, astroid, the linter plugins and the modules of conan loaded
+between runs: once warm, linting a recipe again costs its own analysis only, instead of
+a new start of pylint.
+
+    # In a terminal, relinting the conanfiles of recipes/qt when they are saved
+    python3 linter/lint_daemon.py serve --watch recipes/qt
+
+    # From an editor, or any script
+    python3 linter/lint_daemon.py lint recipes/qt/5.x.x/conanfile.py
+
+Requests are JSON lines on a Unix socket, .cci_build/lint.sock by default:
+
+    {"files": ["/abs/path/conanfile.py"]}  ->  {"messages": [{"path": ..., "line": ..., "msg_id": ...}, ...]}
+    {"command": "stop"}                    ->  {"stopped": true}
+
+"""
+
+import argparse
+import ctypes
+import ctypes.util
+import json
+import os
+import socket
+import socketserver
+import struct
+import sys
+import threading
+import time
+
+from lint_recipes import MSG_TEMPLATE, REPO_ROOT, find_conanfiles, lint, rcfile_kind
+
+DEFAULT_SOCKET = os.path.join(REPO_ROOT, ".cci_build", "lint.sock")
+# Editors save a file in place or rename a temporary file over it, several events arrive at once
+DEBOUNCE = 0.1
+POLL_INTERVAL = 0.5
+
+
+class WarmLinter(object):
+    """ Runs pylint in this process, astroid keeps the modules it built from one run to the next """
+
+    def __init__(self):
+        self._lock = threading.Lock()  # pylint is not thread-safe
+
+    def lint(self, files):
+        """ Messages of the files, as dicts of lint_recipes.lint() with their absolute path """
+        import astroid
+
+        files = sorted(set(os.path.abspath(path) for path in files))
+        messages = []
+        with self._lock:
+            # astroid would return the modules of the files as they were built the previous time
+            for modname, module in list(astroid.MANAGER.astroid_cache.items()):
+                if module.file and os.path.abspath(module.file) in files:
+                    del astroid.MANAGER.astroid_cache[modname]
+            for kind in ("recipe", "test"):
+                paths = [path for path in files if rcfile_kind(path) == kind]
+                if paths:
+                    for path, results in lint(kind, paths).items():
+                        messages.extend(dict(message, path=path)
+                                        for message in sorted(results, key=lambda m: (m["line"], m["column"])))
+        return messages
+
+
+def format_message(message):
+    return MSG_TEMPLATE.format(**dict(message, path=os.path.relpath(message["path"])))
+
+
+class _Inotify(object):
+    """ Events of the folders watched with the inotify API of Linux, through ctypes """
+
+    IN_CLOSE_WRITE = 0x008
+    IN_MOVED_TO = 0x080
+    IN_CREATE = 0x100
+    IN_ISDIR = 0x40000000
+    _EVENT = struct.Struct("iIII")
+
+    def __init__(self):
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = self._libc.inotify_init1(os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.folders = {}
+
+    def add(self, folder):
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(folder),
+                                          self.IN_CLOSE_WRITE | self.IN_MOVED_TO | self.IN_CREATE)
+        if wd >= 0:
+            self.folders[wd] = folder
+
+    def read(self):
+        """ Blocks until some events are available, returns them as (path, is a folder) """
+        data = os.read(self.fd, 64 * 1024)
+        events = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = self._EVENT.unpack_from(data, offset)
+            name = data[offset + self._EVENT.size:offset + self._EVENT.size + length].rstrip(b"\0")
+            offset += self._EVENT.size + length
+            if wd in self.folders and name:
+                events.append((os.path.join(self.folders[wd], os.fsdecode(name)), bool(mask & self.IN_ISDIR)))
+        return events
+
+
+def _walk_folders(paths):
+    for path in paths:
+        for root, dirs, _ in os.walk(path):
+            dirs[:] = [d for d in dirs if not d.startswith(".") and d != "__pycache__"]
+            yield root
+
+
+def watch(paths, on_change):
+    """ Calls `on_change(conanfiles)` with the conanfile.py files saved below `paths`, with inotify on
+        Linux, else by polling their modification time """
+    try:
+        inotify = _Inotify()
+    except (OSError, AttributeError):
+        inotify = None
+    if inotify is None:
+        mtimes = {path: os.path.getmtime(path) for path in find_conanfiles(paths)}
+        while True:
+            time.sleep(POLL_INTERVAL)
+            current = {path: os.path.getmtime(path) for path in find_conanfiles(paths)}
+            changed = [path for path, mtime in current.items() if mtimes.get(path) != mtime]
+            mtimes = current
+            if changed:
+                on_change(changed)
+
+    for folder in _walk_folders(paths):
+        inotify.add(folder)
+    while True:
+        changed = set()
+        deadline = None
+        while deadline is None or time.monotonic() < deadline:
+            for path, is_folder in inotify.read() if deadline is None else _pending(inotify, deadline):
+                if is_folder:
+                    for folder in _walk_folders([path]):
+                        inotify.add(folder)
+                elif os.path.basename(path) == "conanfile.py":
+                    changed.add(path)
+                    deadline = deadline or time.monotonic() + DEBOUNCE
+        on_change(sorted(path for path in changed if os.path.isfile(path)))
+
+
+def _pending(inotify, deadline):
+    """ Events arriving until the deadline """
+    import select
+
+    timeout = max(0.0, deadline - time.monotonic())
+    return inotify.read() if select.select([inotify.fd], [], [], timeout)[0] else []
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+            except ValueError:
+                response = {"error": "invalid request, expected a JSON line"}
+            else:
+                if request.get("command") == "stop":
+                    self._send({"stopped": True})
+                    threading.Thread(target=self.server.shutdown).start()
+                    return
+                try:
+                    response = {"messages": self.server.linter.lint(request.get("files", []))}
+                except Exception as error:  # The server must survive a crash of pylint
+                    response = {"error": f"{type(error).__name__}: {error}"}
+            self._send(response)
+
+    def _send(self, response):
+        self.wfile.write(json.dumps(response).encode() + b"\n")
+
+
+class LintServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path, linter):
+        self.linter = linter
+        super().__init__(path, _RequestHandler)
+
+
+def request(socket_path, message):
+    """ Sends a request to the server, returns its response """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(socket_path)
+        client.sendall(json.dumps(message).encode() + b"\n")
+        with client.makefile("rb") as response:
+            return json.loads(response.readline())
+
+
+def serve(socket_path, watch_paths):
+    try:
+        request(socket_path, {"files": []})
+        print(f"A lint server is already listening on {socket_path}", file=sys.stderr)
+        return 1
+    except (ConnectionError, FileNotFoundError, ValueError):
+        if os.path.exists(socket_path):
+            os.remove(socket_path)  # Left by a server which did not stop cleanly
+    os.makedirs(os.path.dirname(os.path.abspath(socket_path)), exist_ok=True)
+
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+    from linter.conan_stubs import STUBBED_CLASSES, build_stubs, stub_path
+    if any(stub_path(modname) and not os.path.isfile(stub_path(modname)) for modname in STUBBED_CLASSES):
+        build_stubs()
+
+    linter = WarmLinter()
+    start = time.perf_counter()
+    # Warm up: pylint, the plugins and the conan modules of the ConanFile transform
+    linter.lint([os.path.join(REPO_ROOT, "recipes", "cli11", "all", "conanfile.py")])
+    print(f"Warmed up in {time.perf_counter() - start:.1f} s, listening on {socket_path}")
+
+    if watch_paths:
+        def relint(conanfiles):
+            start = time.perf_counter()
+            messages = linter.lint(conanfiles)
+            for message in messages:
+                print(format_message(message))
+            print(f"{len(conanfiles)} files linted in {time.perf_counter() - start:.2f} s, {len(messages)} messages",
+                  flush=True)
+
+        threading.Thread(target=watch, args=(watch_paths, relint), daemon=True).start()
+        print(f"Watching {', '.join(watch_paths)}")
+
+    with LintServer(socket_path, linter) as server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.remove(socket_path)
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lint server keeping pylint and its caches warm between runs.")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET, help="Unix socket of the server (default: .cci_build/lint.sock).")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    server = subparsers.add_parser("serve", help="run the server.")
+    server.add_argument("--watch", nargs="*", default=[], metavar="PATH",
+                        help="folders whose conanfile.py files are linted again when they are saved.")
+    client = subparsers.add_parser("lint", help="lint conanfiles with the running server.")
+    client.add_argument("files", nargs="+")
+    subparsers.add_parser("stop", help="stop the running server.")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        return serve(args.socket, args.watch)
+    try:
+        if args.command == "stop":
+            request(args.socket, {"command": "stop"})
+            return 0
+        response = request(args.socket, {"files": [os.path.abspath(path) for path in find_conanfiles(args.files)]})
+    except (ConnectionError, FileNotFoundError):
+        print(f"No lint server on {args.socket}, start one with `python3 linter/lint_daemon.py serve`", file=sys.stderr)
+        return 2
+    if "error" in response:
+        print(response["error"], file=sys.stderr)
+        return 2
+    for message in response["messages"]:
+        print(format_message(message))
+    # Fatal and error messages fail the check, as in recipe_linter.json
+    return 1 if any(message["msg_id"][0] in "FE" for message in response["messages"]) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,175 @@
+"""
+
+Run pylint over the conanfiles of the recipes in parallel, with the rcfile of a recipe or
+of a test package, and print the messages in the format of recipe_linter.json.
+Messages are cached per file, by the hash of its content and of the linter itself.
+
+"""
+
+import argparse
+import concurrent.futures
+import glob
+import hashlib
+import json
+import os
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RCFILES = {
+    "recipe": os.path.join(REPO_ROOT, "linter", "pylintrc_recipe"),
+    "test": os.path.join(REPO_ROOT, "linter", "pylintrc_testpackage"),
+}
+# Pattern of recipe_linter.json: <file>:<line>: [<id>(<symbol>), <object>] <message>
+MSG_TEMPLATE = "{path}:{line}: [{msg_id}({symbol}), {obj}] {msg}"
+
+
+def rcfile_kind(path):
+    """ test packages (test_package, test_v1_package...) use pylintrc_testpackage """
+    return "test" if os.path.basename(os.path.dirname(os.path.abspath(path))).startswith("test_") else "recipe"
+
+
+def find_conanfiles(paths):
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(glob.glob(os.path.join(path, "**", "conanfile.py"), recursive=True))
+        else:
+            files.append(path)
+    return sorted(set(files))
+
+
+def linter_version():
+    """ Hash of everything but the file itself the messages depend on: the plugins, the rcfiles and the tools """
+    import astroid
+    import pylint
+    sha = hashlib.sha256()
+    for path in sorted(glob.glob(os.path.join(REPO_ROOT, "linter", "*.py"))) + sorted(RCFILES.values()):
+        with open(path, "rb") as f:
+            sha.update(f.read())
+    versions = [pylint.__version__, astroid.__version__, sys.version]
+    try:
+        import conans
+        versions.append(conans.__version__)
+    except ImportError:
+        versions.append("no conan")
+    sha.update(" ".join(versions).encode())
+    return sha.hexdigest()
+
+
+class LintCache(object):
+    """ Messages of a file as <cache>/<key[:2]>/<key>.json, the key is the hash of its content and of the linter """
+
+    def __init__(self, folder, version):
+        self.folder = folder
+        self.version = version
+
+    def key(self, path):
+        sha = hashlib.sha256(self.version.encode())
+        sha.update(rcfile_kind(path).encode())
+        with open(path, "rb") as f:
+            sha.update(f.read())
+        return sha.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.folder, key[:2], f"{key}.json")
+
+    def get(self, key):
+        try:
+            with open(self._path(key)) as f:
+                return json.load(f)
+        except (IOError, ValueError):
+            return None
+
+    def put(self, key, messages):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(f"{path}.tmp", "w") as f:
+            json.dump(messages, f)
+        os.replace(f"{path}.tmp", path)
+
+
+def lint(kind, files):
+    """ Runs pylint once over `files`, returns {path: [messages]} (executed in a worker process) """
+    from pylint.lint import Run
+    from pylint.reporters import CollectingReporter
+
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)  # Plugins of the rcfiles are imported as linter.xxx
+    reporter = CollectingReporter()
+    Run(["--rcfile", RCFILES[kind], "--score=no"] + files, reporter=reporter, exit=False)
+    results = {path: [] for path in files}
+    absolute = {os.path.abspath(path): path for path in files}
+    for message in reporter.messages:
+        path = absolute.get(os.path.abspath(message.path))
+        if path is not None:
+            results[path].append({"line": message.line, "column": message.column, "msg_id": message.msg_id,
+                                  "symbol": message.symbol, "obj": message.obj, "msg": message.msg})
+    return results
+
+
+def shards(files, workers):
+    """ (kind, files) of about the same size, the files of a shard share their rcfile """
+    by_kind = {}
+    for path in files:
+        by_kind.setdefault(rcfile_kind(path), []).append(path)
+    result = []
+    for kind, paths in sorted(by_kind.items()):
+        count = max(1, min(len(paths), round(workers * len(paths) / len(files))))
+        result.extend((kind, paths[i::count]) for i in range(count))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Lint the conanfiles of ConanCenterIndex's recipes and test packages in parallel."
+    )
+    parser.add_argument("paths", nargs="*", default=[os.path.join(REPO_ROOT, "recipes")],
+                        help="conanfiles or folders to search for conanfile.py (default: recipes).")
+    parser.add_argument("--jobs", "-j", type=int, default=os.cpu_count(), help="pylint processes.")
+    parser.add_argument("--cache-dir", default=os.path.join(REPO_ROOT, ".cci_build", "lint_cache"),
+                        help="folder of the cached messages.")
+    parser.add_argument("--no-cache", action="store_true", help="lint every file again.")
+    args = parser.parse_args()
+
+    files = find_conanfiles(args.paths)
+    cache = LintCache(args.cache_dir, linter_version())
+    keys = {path: cache.key(path) for path in files}
+    results = {}
+    for path in files:
+        cached = None if args.no_cache else cache.get(keys[path])
+        if cached is not None:
+            results[path] = cached
+    pending = [path for path in files if path not in results]
+
+    if pending:
+        if REPO_ROOT not in sys.path:
+            sys.path.insert(0, REPO_ROOT)
+        from linter.conan_stubs import STUBBED_CLASSES, build_stubs, stub_path
+        # Every pylint process would build the conans modules of the ConanFile transform otherwise
+        if any(stub_path(modname) and not os.path.isfile(stub_path(modname)) for modname in STUBBED_CLASSES):
+            build_stubs()
+
+    if len(pending) == 1 or args.jobs <= 1:
+        # Not worth the start of a process
+        for kind, paths in shards(pending, 1):
+            results.update(lint(kind, paths))
+    elif pending:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=args.jobs) as executor:
+            for shard_results in executor.map(lint, *zip(*shards(pending, args.jobs))):
+                results.update(shard_results)
+    for path in pending:
+        cache.put(keys[path], results[path])
+
+    count = errors = 0
+    for path in files:
+        for message in sorted(results[path], key=lambda m: (m["line"], m["column"])):
+            print(MSG_TEMPLATE.format(path=os.path.relpath(path), **message))
+            count += 1
+            # Fatal and error messages fail the check, as in recipe_linter.json
+            errors += message["msg_id"][0] in "FE"
+    print(f"{len(files)} files, {len(files) - len(pending)} from the cache, {count} messages", file=sys.stderr)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -2,12 +2,17 @@
 # Class ConanFile doesn't declare all the valid members and functions,
 #   some are injected by Conan dynamically to the class.
 
+import functools
+import os
 import textwrap
 import astroid
 from astroid.builder import AstroidBuilder
 from astroid.manager import AstroidManager
 
+from linter.conan_stubs import STUBBED_CLASSES, stub_path
 
+
+@functools.lru_cache(maxsize=None)
 def _settings_transform():
     module = AstroidBuilder(AstroidManager()).string_build(
         textwrap.dedent("""
@@ -20,6 +25,7 @@ def _settings_transform():
     )
     return module['Settings']
 
+@functools.lru_cache(maxsize=None)
 def _user_info_build_transform():
     module = AstroidBuilder(AstroidManager()).string_build(
         textwrap.dedent("""
@@ -30,26 +36,33 @@ def _user_info_build_transform():
     return module['UserInfoBuild']
 
 
+def _conans_class(modname):
+    """Lookup of a class of conans in its stub, if built, to avoid building its module and the ones it imports"""
+    classname = STUBBED_CLASSES[modname]
+    path = stub_path(modname)
+    if path and os.path.isfile(path):
+        with open(path) as f:
+            module = AstroidBuilder(AstroidManager()).string_build(f.read(), modname=modname, path=path)
+        return module.lookup(classname)
+    return astroid.MANAGER.ast_from_module_name(modname).lookup(classname)
+
+
 def register(_):
     pass
 
-def transform_conanfile(node):
-    """Transform definition of ConanFile class so dynamic fields are visible to pylint"""
+@functools.lru_cache(maxsize=None)
+def _dynamic_fields():
+    """Nodes of the dynamic fields, resolved on the first transform and shared by the next ones"""
 
     str_class = astroid.builtin_lookup("str")
     dict_class = astroid.builtin_lookup("dict")
-    info_class = astroid.MANAGER.ast_from_module_name("conans.model.info").lookup(
-        "ConanInfo")
-    build_requires_class = astroid.MANAGER.ast_from_module_name(
-        "conans.client.graph.graph_manager").lookup("_RecipeBuildRequires")
-    file_copier_class = astroid.MANAGER.ast_from_module_name(
-        "conans.client.file_copier").lookup("FileCopier")
-    file_importer_class = astroid.MANAGER.ast_from_module_name(
-        "conans.client.importer").lookup("_FileImporter")
-    python_requires_class = astroid.MANAGER.ast_from_module_name(
-        "conans.client.graph.python_requires").lookup("PyRequires")
-
-    dynamic_fields = {
+    info_class = _conans_class("conans.model.info")
+    build_requires_class = _conans_class("conans.client.graph.graph_manager")
+    file_copier_class = _conans_class("conans.client.file_copier")
+    file_importer_class = _conans_class("conans.client.importer")
+    python_requires_class = _conans_class("conans.client.graph.python_requires")
+
+    return {
         "conan_data": str_class,
         "build_requires": build_requires_class,
         "tool_requires": build_requires_class,
@@ -64,8 +77,12 @@ def transform_conanfile(node):
         "settings_target": [_settings_transform()],
         "conf": dict_class,
     }
-    
-    for f, t in dynamic_fields.items():
+
+
+def transform_conanfile(node):
+    """Transform definition of ConanFile class so dynamic fields are visible to pylint"""
+
+    for f, t in _dynamic_fields().items():
         node.locals[f] = [i for i in t]
 
 
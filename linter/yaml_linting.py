@@ -1,4 +1,6 @@
 import argparse
+import concurrent.futures
+import os
 
 
 def file_path(a_string):
@@ -7,3 +9,87 @@ def file_path(a_string):
     if not isfile(a_string):
         raise argparse.ArgumentTypeError(f"{a_string} does not point to a file")
     return a_string
+
+
+def file_or_directory_path(a_string):
+    if not os.path.isfile(a_string) and not os.path.isdir(a_string):
+        raise argparse.ArgumentTypeError(f"{a_string} does not point to a file or a directory")
+    return a_string
+
+
+def yaml_files(paths, filename):
+    """The files of `paths` and the `filename` files found below the directories among them"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, names in os.walk(path):
+                dirs.sort()
+                if filename in names:
+                    files.append(os.path.join(root, filename))
+        else:
+            files.append(path)
+    return files
+
+
+def validate_files(validate, files, jobs):
+    """Annotations of `validate(path)` for each file, in the order of the files, validated in a process pool"""
+    if jobs <= 1 or len(files) <= 1:
+        return [validate(path) for path in files]
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+        return list(executor.map(validate, files, chunksize=max(1, len(files) // (4 * jobs))))
+
+
+class _NotStrictYaml(Exception):
+    pass
+
+
+def _block_node(event, events):
+    import yaml
+
+    if event.anchor is not None or getattr(event, "tag", None) is not None:
+        raise _NotStrictYaml()
+    if isinstance(event, yaml.ScalarEvent):
+        if event.value == "":
+            raise _NotStrictYaml()
+        return event.value
+    if isinstance(event, yaml.MappingStartEvent) and not event.flow_style:
+        mapping = {}
+        for key_event in events:
+            if isinstance(key_event, yaml.MappingEndEvent):
+                return mapping
+            if not isinstance(key_event, yaml.ScalarEvent) or key_event.value in mapping:
+                raise _NotStrictYaml()
+            key = _block_node(key_event, events)
+            mapping[key] = _block_node(next(events), events)
+    if isinstance(event, yaml.SequenceStartEvent) and not event.flow_style:
+        sequence = []
+        for item_event in events:
+            if isinstance(item_event, yaml.SequenceEndEvent):
+                return sequence
+            sequence.append(_block_node(item_event, events))
+    # Aliases, flow style
+    raise _NotStrictYaml()
+
+
+def block_yaml(content):
+    """Content of a YAML document read with the C parser of PyYAML, every scalar as a string like strictyaml
+    does, None if PyYAML is missing or if the document cannot be read, or uses what strictyaml rejects or
+    reads otherwise: flow style, anchors, aliases, tags, duplicated keys, empty values, directives or
+    several documents"""
+    try:
+        import yaml
+    except ImportError:
+        return None
+    events = yaml.parse(content, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader))
+    try:
+        if not isinstance(next(events), yaml.StreamStartEvent):
+            return None
+        start = next(events)
+        if not isinstance(start, yaml.DocumentStartEvent) or start.version or start.tags:
+            return None
+        document = _block_node(next(events), events)
+        if not isinstance(next(events), yaml.DocumentEndEvent) or not isinstance(next(events), yaml.StreamEndEvent):
+            return None
+        return document
+    except (yaml.YAMLError, _NotStrictYaml, StopIteration):
+        return None
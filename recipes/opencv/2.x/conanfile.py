@@ -198,6 +198,7 @@ class OpenCVConan(ConanFile):
         self._cmake.definitions["OPENCV_MODULES_PUBLIC"] = "opencv"
         self._cmake.definitions["BUILD_opencv_nonfree"] = self.options.nonfree
 
+        # The launcher comes from the CMAKE_<LANG>_COMPILER_LAUNCHER environment variables, not from the detection of ccache
         self._cmake.definitions["ENABLE_CCACHE"] = False
 
         if self._is_msvc:
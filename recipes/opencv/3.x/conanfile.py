@@ -2,6 +2,7 @@ from conan.tools.microsoft import msvc_runtime_flag
 from conans import ConanFile, CMake, tools
 from conans.errors import ConanInvalidConfiguration
 import os
+import shutil
 import textwrap
 
 required_conan_version = ">=1.43.0"
@@ -20,7 +21,7 @@ class OpenCVConan(ConanFile):
         "shared": [True, False],
         "fPIC": [True, False],
         "contrib": [True, False],
-        "parallel": [False, "tbb", "openmp"],
+        "parallel": [None, False, "pthreads", "tbb", "openmp"],
         "with_jpeg": [False, "libjpeg", "libjpeg-turbo"],
         "with_png": [True, False],
         "with_tiff": [True, False],
@@ -30,11 +31,12 @@ class OpenCVConan(ConanFile):
         "with_webp": [True, False],
         "with_gtk": [True, False],
         "nonfree": [True, False],
+        "neon": [None, True, False],
     }
     default_options = {
         "shared": False,
         "fPIC": True,
-        "parallel": False,
+        "parallel": None,  # pthreads, or False with Visual Studio
         "contrib": False,
         "with_jpeg": False,
         "with_png": False,
@@ -45,6 +47,7 @@ class OpenCVConan(ConanFile):
         "with_webp": False,
         "with_gtk": False,
         "nonfree": False,
+        "neon": None,  # True on the ARM archs which always have NEON
     }
 
     short_paths = True
@@ -68,13 +71,27 @@ class OpenCVConan(ConanFile):
     def _is_msvc(self):
         return str(self.settings.compiler) in ["Visual Studio", "msvc"]
 
+    @property
+    def _has_neon_by_default(self):
+        # NEON is part of ARMv8 and of the hard-float ARMv7 targets, optional on the older ones
+        arch = str(self.settings.arch)
+        return arch.startswith("armv8") or arch in ["armv7hf", "armv7s", "armv7k", "arm64ec"]
+
     def config_options(self):
         if self.settings.os == "Windows":
             del self.options.fPIC
         if self.settings.os != "Linux":
             del self.options.with_gtk
+        if "arm" not in str(self.settings.arch):
+            del self.options.neon
 
     def configure(self):
+        # The defaults depend on the settings, values given by the user are kept
+        if self.options.parallel == "None":
+            # OpenCV uses the Concurrency runtime of MSVC, which has no pthreads
+            self.options.parallel = False if self._is_msvc else "pthreads"
+        if self.options.get_safe("neon") == "None":
+            self.options.neon = self._has_neon_by_default
         if self.options.shared:
             del self.options.fPIC
         self.options["*"].jpeg = self.options.with_jpeg
@@ -112,6 +129,8 @@ class OpenCVConan(ConanFile):
     def validate(self):
         if self.settings.compiler.get_safe("cppstd") and self.options.with_openexr:
             tools.check_min_cppstd(self, 11)
+        if self.options.parallel == "pthreads" and self._is_msvc:
+            raise ConanInvalidConfiguration("parallel=pthreads is not available with Visual Studio")
         if self.options.shared and self._is_msvc and "MT" in msvc_runtime_flag(self):
             raise ConanInvalidConfiguration("Visual Studio with static runtime is not supported for shared library.")
         if self.settings.compiler == "clang" and tools.Version(self.settings.compiler.version) < "4":
@@ -121,8 +140,27 @@ class OpenCVConan(ConanFile):
         tools.get(**self.conan_data["sources"][self.version][0],
                   destination=self._source_subfolder, strip_root=True)
 
-        tools.get(**self.conan_data["sources"][self.version][1],
-                  destination=self._contrib_folder, strip_root=True)
+    @property
+    def _contrib_sources_folder(self):
+        # Next to the source folder of the reference in the conan cache, for the archive of conandata.yml
+        sha256 = self.conan_data["sources"][self.version][1]["sha256"]
+        base = os.path.dirname(self.recipe_folder) if self.in_local_cache else self.build_folder
+        return os.path.join(base, f"contrib_{sha256[:12]}")
+
+    def _get_contrib(self):
+        # The source folder is shared by all the configurations, and only the builds with contrib need opencv_contrib:
+        # the first of them extracts it once for the reference, each build copies it as the patches depend on the options
+        sources = self._contrib_sources_folder
+        if not os.path.isdir(sources):
+            extracting = f"{sources}.{os.getpid()}"
+            tools.get(**self.conan_data["sources"][self.version][1],
+                      destination=extracting, strip_root=True)
+            try:
+                os.rename(extracting, sources)
+            except OSError:  # Extracted meanwhile by a build of another configuration
+                tools.rmdir(extracting)
+        tools.rmdir(self._contrib_folder)
+        shutil.copytree(sources, self._contrib_folder, symlinks=True)
 
     def _patch_opencv(self):
         # tools.rmdir(os.path.join(self._source_subfolder, "3rdparty"))
@@ -248,7 +286,6 @@ class OpenCVConan(ConanFile):
         self._cmake.definitions["WITH_OPENVX"] = False
         self._cmake.definitions["WITH_PLAIDML"] = False
         self._cmake.definitions["WITH_PROTOBUF"] = False
-        self._cmake.definitions["WITH_PTHREADS_PF"] = False
         self._cmake.definitions["WITH_PVAPI"] = False
         self._cmake.definitions["WITH_QT"] = False
         self._cmake.definitions["WITH_QUIRC"] = False
@@ -261,7 +298,6 @@ class OpenCVConan(ConanFile):
         self._cmake.definitions["WITH_XINE"] = False
         self._cmake.definitions["WITH_LAPACK"] = False
         self._cmake.definitions["WITH_IPP_IW"] = False
-        self._cmake.definitions["WITH_CAROTENE"] = False
         self._cmake.definitions["WITH_PROTOBUF"] = False
         self._cmake.definitions["WITH_LAPACK"] = False
 
@@ -280,9 +316,14 @@ class OpenCVConan(ConanFile):
 
         self._cmake.definitions["OPENCV_MODULES_PUBLIC"] = "opencv"
         self._cmake.definitions["OPENCV_ENABLE_NONFREE"] = self.options.nonfree
-        if self.options.parallel:
-            self._cmake.definitions["WITH_TBB"] = self.options.parallel == "tbb"
-            self._cmake.definitions["WITH_OPENMP"] = self.options.parallel == "openmp"
+        self._cmake.definitions["WITH_PTHREADS_PF"] = self.options.parallel == "pthreads"
+        self._cmake.definitions["WITH_TBB"] = self.options.parallel == "tbb"
+        self._cmake.definitions["WITH_OPENMP"] = self.options.parallel == "openmp"
+
+        # Carotene is the NEON implementation of the HAL of OpenCV
+        self._cmake.definitions["WITH_CAROTENE"] = bool(self.options.get_safe("neon"))
+        if self.options.get_safe("neon") is not None:
+            self._cmake.definitions["ENABLE_NEON"] = self.options.neon
 
         if self.options.contrib:
             self._cmake.definitions["OPENCV_EXTRA_MODULES_PATH"] = os.path.join(self.build_folder, self._contrib_folder, 'modules')
@@ -292,12 +333,15 @@ class OpenCVConan(ConanFile):
         if self.options.with_openexr:
             self._cmake.definitions["OPENEXR_ROOT"] = self.deps_cpp_info['openexr'].rootpath.replace("\\", "/")
         self._cmake.definitions["ENABLE_PIC"] = self.options.get_safe("fPIC", True)
+        # The launcher comes from the CMAKE_<LANG>_COMPILER_LAUNCHER environment variables, not from the detection of ccache
         self._cmake.definitions["ENABLE_CCACHE"] = False
 
         self._cmake.configure(build_folder=self._build_subfolder)
         return self._cmake
 
     def build(self):
+        if self.options.contrib:
+            self._get_contrib()
         self._patch_opencv()
         cmake = self._configure_cmake()
         cmake.build()
@@ -356,9 +400,7 @@ class OpenCVConan(ConanFile):
             return ["eigen::eigen"] if self.options.with_eigen else []
 
         def parallel():
-            if self.options.parallel:
-                return ["onetbb::onetbb"] if self.options.parallel == "tbb" else ["openmp"]
-            return []
+            return ["onetbb::onetbb"] if self.options.parallel == "tbb" else []
 
         def xfeatures2d():
             return ["opencv_xfeatures2d"] if self.options.contrib else []
@@ -470,6 +512,12 @@ class OpenCVConan(ConanFile):
 
         add_components(self._opencv_components)
 
+        if not self.options.shared and self.options.get_safe("neon"):
+            self.cpp_info.components["opencv_core"].libs.append("tegra_hal")
+        if self.options.parallel == "openmp" and not self._is_msvc:
+            self.cpp_info.components["opencv_core"].sharedlinkflags.append("-fopenmp")
+            self.cpp_info.components["opencv_core"].exelinkflags.append("-fopenmp")
+
         if self.settings.os == "Windows":
             self.cpp_info.components["opencv_imgcodecs"].system_libs = ["comctl32", "gdi32", "ole32", "setupapi", "ws2_32", "vfw32"]
         elif self.settings.os == "Macos":
@@ -7,6 +7,9 @@
 
 #include <opencv2/core/core.hpp>
 #include <opencv2/imgproc.hpp>
+#include <iostream>
+#include <sstream>
+#include <string>
 #ifdef BUILT_CONTRIB
 #include <opencv2/sfm.hpp>
 #endif
@@ -21,6 +24,7 @@ void MyFilledCircle( Mat img, Point center );
 void MyPolygon( Mat img );
 void MyLine( Mat img, Point start, Point end );
 void TestSFM();
+void ReportParallelism();
 
 /**
  * @function main
@@ -68,6 +72,7 @@ int main( void ){
   MyLine( rook_image, Point( w/2, 7*w/8 ), Point( w/2, w ) );
   MyLine( rook_image, Point( 3*w/4, 7*w/8 ), Point( 3*w/4, w ) );
   TestSFM();
+  ReportParallelism();
 
   return(0);
 }
@@ -177,3 +182,21 @@ void TestSFM()
   Matx33f ax = sfm::skew(a);
 #endif
 }
+
+/**
+ * @function ReportParallelism
+ * @brief Print the threading backend and the NEON support OpenCV runs with
+ */
+void ReportParallelism()
+{
+  std::cout << "Threads: " << getNumThreads() << std::endl;
+  std::cout << "NEON: " << (checkHardwareSupport(CV_CPU_NEON) ? "yes" : "no") << std::endl;
+
+  std::istringstream info(getBuildInformation());
+  std::string line;
+  while (std::getline(info, line)) {
+    if (line.find("Parallel framework") != std::string::npos || line.find("Custom HAL") != std::string::npos) {
+      std::cout << line << std::endl;
+    }
+  }
+}
@@ -2,6 +2,7 @@ from conan.tools.microsoft import msvc_runtime_flag
 from conans import ConanFile, CMake, tools
 from conans.errors import ConanInvalidConfiguration
 import os
+import shutil
 import textwrap
 
 required_conan_version = ">=1.43.0"
@@ -51,6 +52,8 @@ class OpenCVConan(ConanFile):
         "cpu_baseline": "ANY",
         "cpu_dispatch": "ANY",
         "nonfree": [True, False],
+        "modules": "ANY",
+        "world": [True, False],
     }
     default_options = {
         "shared": False,
@@ -87,11 +90,14 @@ class OpenCVConan(ConanFile):
         "cpu_baseline": None,
         "cpu_dispatch": None,
         "nonfree": False,
+        "modules": None,
+        "world": False,
     }
 
     short_paths = True
     generators = "cmake", "cmake_find_package"
     _cmake = None
+    _components_cache = None
 
     @property
     def _source_subfolder(self):
@@ -125,6 +131,36 @@ class OpenCVConan(ConanFile):
     def _protobuf_version(self):
         return "protobuf/3.17.1"
 
+    @property
+    def _requested_modules(self):
+        # "core,imgproc,imgcodecs", with or without the opencv_ prefix, like BUILD_LIST
+        if not self.options.modules:
+            return None
+        names = str(self.options.modules).replace(";", ",").replace(" ", ",").split(",")
+        return {name if name.startswith("opencv_") else "opencv_" + name for name in names if name} or None
+
+    # Options only used by some modules, disabled when the option modules leaves these modules out
+    _module_options = {
+        "with_jpeg": ["opencv_imgcodecs"],
+        "with_png": ["opencv_imgcodecs"],
+        "with_tiff": ["opencv_imgcodecs"],
+        "with_jpeg2000": ["opencv_imgcodecs"],
+        "with_openexr": ["opencv_imgcodecs"],
+        "with_webp": ["opencv_imgcodecs"],
+        "with_imgcodec_hdr": ["opencv_imgcodecs"],
+        "with_imgcodec_pfm": ["opencv_imgcodecs"],
+        "with_imgcodec_pxm": ["opencv_imgcodecs"],
+        "with_imgcodec_sunraster": ["opencv_imgcodecs"],
+        "with_ffmpeg": ["opencv_videoio"],
+        "with_v4l": ["opencv_videoio"],
+        "with_gtk": ["opencv_highgui"],
+        "with_quirc": ["opencv_objdetect"],
+        "dnn": ["opencv_dnn", "opencv_objdetect"],
+        "with_ade": ["opencv_gapi"],
+        "contrib_freetype": ["opencv_freetype"],
+        "contrib_sfm": ["opencv_sfm"],
+    }
+
     def export_sources(self):
         self.copy("CMakeLists.txt")
         for patch in self.conan_data.get("patches", {}).get(self.version, []):
@@ -153,6 +189,15 @@ class OpenCVConan(ConanFile):
             del self.options.with_tiff
 
     def configure(self):
+        if not self._requested_modules:
+            self.options.modules = None  # "", "," or " " build every module, as the default
+        else:
+            # One package for the same modules in any order
+            self.options.modules = ",".join(sorted(self._requested_modules))
+            modules = [component["target"] for component in self._opencv_components]
+            for option, users in self._module_options.items():
+                if self.options.get_safe(option) and not any(module in modules for module in users):
+                    setattr(self.options, option, False)
         if self.options.shared:
             del self.options.fPIC
         if not self.options.contrib:
@@ -231,6 +276,10 @@ class OpenCVConan(ConanFile):
              not str(self.settings.os) in ["Linux", "Macos", "Windows"]):
             raise ConanInvalidConfiguration("opencv-icv is not available for %s/%s" % \
                 (str(self.settings.os), str(self.settings.arch)))
+        if self._requested_modules:
+            missing = self._requested_modules - {component["target"] for component in self._opencv_components}
+            if missing:
+                raise ConanInvalidConfiguration(f"modules {', '.join(sorted(missing))} are not available with these options")
 
     def build_requirements(self):
         if self.options.dnn and hasattr(self, "settings_build"):
@@ -240,8 +289,27 @@ class OpenCVConan(ConanFile):
         tools.get(**self.conan_data["sources"][self.version][0],
                   destination=self._source_subfolder, strip_root=True)
 
-        tools.get(**self.conan_data["sources"][self.version][1],
-                  destination=self._contrib_folder, strip_root=True)
+    @property
+    def _contrib_sources_folder(self):
+        # Next to the source folder of the reference in the conan cache, for the archive of conandata.yml
+        sha256 = self.conan_data["sources"][self.version][1]["sha256"]
+        base = os.path.dirname(self.recipe_folder) if self.in_local_cache else self.build_folder
+        return os.path.join(base, f"contrib_{sha256[:12]}")
+
+    def _get_contrib(self):
+        # The source folder is shared by all the configurations, and only the builds with contrib need opencv_contrib:
+        # the first of them extracts it once for the reference, each build copies it as the patches depend on the options
+        sources = self._contrib_sources_folder
+        if not os.path.isdir(sources):
+            extracting = f"{sources}.{os.getpid()}"
+            tools.get(**self.conan_data["sources"][self.version][1],
+                      destination=extracting, strip_root=True)
+            try:
+                os.rename(extracting, sources)
+            except OSError:  # Extracted meanwhile by a build of another configuration
+                tools.rmdir(extracting)
+        tools.rmdir(self._contrib_folder)
+        shutil.copytree(sources, self._contrib_folder, symlinks=True)
 
     def _patch_opencv(self):
         for patch in self.conan_data.get("patches", {}).get(self.version, []):
@@ -440,6 +508,10 @@ class OpenCVConan(ConanFile):
         self._cmake.definitions["WITH_MSMF"] = self._is_msvc
         self._cmake.definitions["WITH_MSMF_DXVA"] = self._is_msvc
         self._cmake.definitions["OPENCV_MODULES_PUBLIC"] = "opencv"
+        self._cmake.definitions["BUILD_opencv_world"] = self.options.world
+        if self._requested_modules:
+            modules = [component["lib"] for component in self._opencv_components if component["target"].startswith("opencv_")]
+            self._cmake.definitions["BUILD_LIST"] = ",".join(modules + (["world"] if self.options.world else []))
         self._cmake.definitions["OPENCV_ENABLE_NONFREE"] = self.options.nonfree
 
         if self.options.cpu_baseline:
@@ -485,6 +557,7 @@ class OpenCVConan(ConanFile):
         self._cmake.definitions["WITH_CUDNN"] = self.options.get_safe("with_cudnn", False)
 
         self._cmake.definitions["ENABLE_PIC"] = self.options.get_safe("fPIC", True)
+        # The launcher comes from the CMAKE_<LANG>_COMPILER_LAUNCHER environment variables, not from the detection of ccache
         self._cmake.definitions["ENABLE_CCACHE"] = False
 
         if self._is_msvc:
@@ -514,6 +587,8 @@ class OpenCVConan(ConanFile):
         return self._cmake
 
     def build(self):
+        if self.options.contrib:
+            self._get_contrib()
         self._patch_opencv()
         cmake = self._configure_cmake()
         cmake.build()
@@ -530,7 +605,7 @@ class OpenCVConan(ConanFile):
         # TODO: to remove in conan v2 once cmake_find_package* generators removed
         self._create_cmake_module_alias_targets(
             os.path.join(self.package_folder, self._module_file_rel_path),
-            {component["target"]:"opencv::{}".format(component["target"]) for component in self._opencv_components}
+            {component["target"]:"opencv::{}".format(component["target"]) for component in self._package_components()}
         )
 
     @staticmethod
@@ -564,6 +639,13 @@ class OpenCVConan(ConanFile):
 
     @property
     def _opencv_components(self):
+        # Built once for each set of option values, configure() changes some of them
+        key = self.options.values.dumps()
+        if self._components_cache is None or self._components_cache[0] != key:
+            self._components_cache = (key, self._components_of_options())
+        return self._components_cache[1]
+
+    def _components_of_options(self):
         def imageformats_deps():
             components = []
             if self.options.get_safe("with_jpeg2000"):
@@ -728,12 +810,47 @@ class OpenCVConan(ConanFile):
                 {"target": "opencv_gapi",           "lib": "gapi",              "requires": ["opencv_imgproc", "opencv_calib3d", "opencv_video", "ade::ade"]},
             ])
 
+        if self._requested_modules:
+            opencv_components = self._with_dependencies(opencv_components, self._requested_modules)
+
         return opencv_components
 
+    def _package_components(self):
+        """ Components of the package: with opencv_world, one library with the requirements of all the modules it
+            contains, and the targets of the modules as its aliases, so that consumers link the same targets """
+        components = self._opencv_components
+        if not self.options.world:
+            return components
+        modules = [component for component in components if component["target"].startswith("opencv_")]
+        targets = {component["target"] for component in modules}
+        requires = []
+        for component in modules:
+            requires.extend(require for require in component["requires"] if require not in targets and require not in requires)
+        # ippiw and the libraries of sfm (numeric, multiview, correspondence) are not part of opencv_world
+        others = [component for component in components if component["target"] not in targets]
+        aliases = [dict(component, requires=["opencv_world"], interface=True) for component in modules]
+        return [{"target": "opencv_world", "lib": "world", "requires": requires}] + others + aliases
+
+    def _with_dependencies(self, components, targets):
+        """ Components of the targets and of the modules they depend on """
+        by_target = {component["target"]: component for component in components}
+        selected = set()
+        pending = [target for target in targets if target in by_target]
+        if self.options.dnn and "opencv_objdetect" in pending:
+            pending.append("opencv_dnn")  # objdetect comes with dnn in this recipe, both need the dnn option
+        while pending:
+            target = pending.pop()
+            if target not in selected:
+                selected.add(target)
+                pending.extend(require for require in by_target[target]["requires"] if require in by_target)
+        return [component for component in components if component["target"] in selected]
+
     def package_info(self):
         version = self.version.split(".")
         version = "".join(version) if self.settings.os == "Windows" else ""
         debug = "d" if self.settings.build_type == "Debug" and self.settings.os == "Windows" else ""
+        # Library of opencv_core, or of opencv_world which contains it, the 3rd party libraries of a static build go with it
+        main_component = "opencv_world" if self.options.world else "opencv_core"
 
         def get_lib_name(module):
             if module == "ippiw":
@@ -743,7 +860,7 @@ class OpenCVConan(ConanFile):
             else:
                 return "opencv_%s%s%s" % (module, version, debug)
 
-        def add_components(components):
+        def add_components(components, package_libs):
             for component in components:
                 conan_component = component["target"]
                 cmake_target = component["target"]
@@ -753,7 +870,7 @@ class OpenCVConan(ConanFile):
                 # TODO: we should also define COMPONENTS names of each target for find_package() but not possible yet in CMakeDeps
                 #       see https://github.com/conan-io/conan/issues/10258
                 self.cpp_info.components[conan_component].set_property("cmake_target_name", cmake_target)
-                self.cpp_info.components[conan_component].libs = [lib_name]
+                self.cpp_info.components[conan_component].libs = [] if component.get("interface") else [lib_name]
                 if lib_name.startswith("ippiw"):
                     self.cpp_info.components[conan_component].libs.append("ippicvmt" if self.settings.os == "Windows" else "ippicv")
                 if self.settings.os != "Windows":
@@ -771,15 +888,14 @@ class OpenCVConan(ConanFile):
                     if not self.options.shared:
                         self.cpp_info.components[conan_component].libdirs.append(
                             os.path.join("sdk", "native", "staticlibs", tools.to_android_abi(str(self.settings.arch))))
-                        if conan_component == "opencv_core":
+                        if conan_component == main_component:
                             self.cpp_info.components[conan_component].libdirs.append("lib")
-                            self.cpp_info.components[conan_component].libs += tools.collect_libs(self)
+                            self.cpp_info.components[conan_component].libs += package_libs
 
                 if self.settings.os in ["iOS", "Macos", "Linux", "Neutrino"]:
                     if not self.options.shared:
-                        if conan_component == "opencv_core":
-                            libs = list(filter(lambda x: not x.startswith("opencv"), tools.collect_libs(self)))
-                            self.cpp_info.components[conan_component].libs += libs
+                        if conan_component == main_component:
+                            self.cpp_info.components[conan_component].libs += [lib for lib in package_libs if not lib.startswith("opencv")]
 
                 # TODO: to remove in conan v2 once cmake_find_package* generators removed
                 self.cpp_info.components[conan_component].names["cmake_find_package"] = cmake_target
@@ -799,16 +915,27 @@ class OpenCVConan(ConanFile):
 
         self.cpp_info.set_property("cmake_file_name", "OpenCV")
 
-        add_components(self._opencv_components)
-
-        if self.settings.os == "Windows":
-            self.cpp_info.components["opencv_highgui"].system_libs = ["comctl32", "gdi32", "ole32", "setupapi", "ws2_32", "vfw32"]
-        elif self.settings.os == "Macos":
-            self.cpp_info.components["opencv_highgui"].frameworks = ["Cocoa"]
-            self.cpp_info.components["opencv_videoio"].frameworks = ["Cocoa", "Accelerate", "AVFoundation", "CoreGraphics", "CoreMedia", "CoreVideo", "QuartzCore"]
-        elif self.settings.os == "iOS":
-            self.cpp_info.components["opencv_videoio"].frameworks = ["AVFoundation", "QuartzCore"]
+        opencv_components = self._package_components()
+        # The libraries of the package folder, listed once for the component the 3rd party libraries go with
+        add_components(opencv_components, tools.collect_libs(self) if not self.options.shared else [])
+        self._add_system_libs([component["target"] for component in opencv_components])
 
         # TODO: to remove in conan v2 once cmake_find_package* generators removed
         self.cpp_info.filenames["cmake_find_package"] = "OpenCV"
         self.cpp_info.filenames["cmake_find_package_multi"] = "OpenCV"
+
+    def _add_system_libs(self, targets):
+        """ System libraries and frameworks of highgui and videoio, of opencv_world when it contains them """
+        highgui = "opencv_world" if self.options.world else "opencv_highgui"
+        videoio = "opencv_world" if self.options.world else "opencv_videoio"
+        if self.settings.os == "Windows":
+            if "opencv_highgui" in targets:
+                self.cpp_info.components[highgui].system_libs += ["comctl32", "gdi32", "ole32", "setupapi", "ws2_32", "vfw32"]
+        elif self.settings.os == "Macos":
+            if "opencv_highgui" in targets:
+                self.cpp_info.components[highgui].frameworks += ["Cocoa"]
+            if "opencv_videoio" in targets:
+                self.cpp_info.components[videoio].frameworks += ["Cocoa", "Accelerate", "AVFoundation", "CoreGraphics", "CoreMedia", "CoreVideo", "QuartzCore"]
+        elif self.settings.os == "iOS":
+            if "opencv_videoio" in targets:
+                self.cpp_info.components[videoio].frameworks += ["AVFoundation", "QuartzCore"]
@@ -154,6 +154,11 @@ class QtConan(ConanFile):
         )
         open(os.path.join(self.source_folder, "qt5", "qtbase", "mkspecs", "features", "uikit", "bitcode.prf"), "w").close()
 
+    @property
+    def _compiler_launcher(self):
+        # qmake has no launcher variable, build() prefixes QMAKE_CC and QMAKE_CXX with it
+        return os.getenv("CCI_COMPILER_LAUNCHER")
+
     def _make_program(self):
         if is_msvc(self):
             return "jom"
@@ -426,6 +431,17 @@ class QtConan(ConanFile):
                          'QMAKE_LINK="' + value + '"',
                          'QMAKE_LINK_SHLIB="' + value + '"']
 
+        launcher = self._compiler_launcher
+        if launcher:
+            cc, cxx = ("cl", "cl") if is_msvc(self) else (os.getenv("CC"), os.getenv("CXX"))
+            if cc and cxx:
+                # Only the compilers, QMAKE_LINK* keep calling them directly
+                args += [f'QMAKE_CC="{launcher} {cc}"', f'QMAKE_CXX="{launcher} {cxx}"']
+            elif os.path.splitext(os.path.basename(launcher))[0] == "ccache":
+                args.append("-ccache")
+            else:
+                self.output.warn(f"{launcher} not used, it needs CC and CXX in the [env] section of the profile")
+
         if self._settings_build.os == "Linux" and self.settings.compiler == "clang":
             args += ['QMAKE_CXXFLAGS+="-ftemplate-depth=1024"']
 